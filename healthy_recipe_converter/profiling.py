@@ -0,0 +1,176 @@
+import cProfile
+import contextlib
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class RequestProfile:
+    """Timings collected for one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans: Dict[str, float] = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+
+
+def span(name: str) -> ContextManager:
+    """
+    Time a block as a named span of the current request's profile. Repeated
+    spans with the same name add up. Outside a profiled request (or with
+    profiling off) this is a shared no-op context manager.
+    """
+    profile = _current.get()
+    if profile is None:
+        return _NO_SPAN
+    return profile.span(name)
+
+
+class SlowestProfiles:
+    """Keeps cProfile dumps for the `keep` slowest sampled requests in `directory`."""
+
+    def __init__(self, directory: Path, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.heap: List[Tuple[float, str]] = []
+        self.lock = threading.Lock()
+
+    def offer(self, duration: float, request, profiler: cProfile.Profile) -> Optional[str]:
+        """Write the dump if `duration` ranks among the slowest; returns its path."""
+        if self.keep <= 0:
+            return None
+        with self.lock:
+            if len(self.heap) >= self.keep and duration <= self.heap[0][0]:
+                return None
+            slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+            path = str(self.directory / (
+                f'{duration * 1000:.0f}ms-{request.method}-{slug}-{time.time_ns()}.prof'
+            ))
+            profiler.dump_stats(path)
+            if len(self.heap) >= self.keep:
+                _, evicted = heapq.heapreplace(self.heap, (duration, path))
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(evicted)
+            else:
+                heapq.heappush(self.heap, (duration, path))
+            return path
+
+
+class ProfilingMiddleware:
+    """
+    Records wall time, query count, SQL time and `span()` timings per request,
+    and reports them in a Server-Timing header and a JSON log line on the
+    `healthy_recipe_converter.profiling` logger.
+
+    With REQUEST_PROFILING['SAMPLE_RATE'] above 0, that fraction of requests
+    also runs under cProfile, and dumps for the KEEP_SLOWEST slowest of them
+    (per process) are kept in PROFILE_DIR. Inspect them with `python -m pstats`.
+
+    Streaming responses are timed until the first byte, not the last. When
+    REQUEST_PROFILING['ENABLED'] is False the middleware removes itself from
+    the stack at startup.
+    """
+
+    def __init__(self, get_response):
+        config = settings.REQUEST_PROFILING
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = config['SAMPLE_RATE']
+        self.slowest = None
+        if self.sample_rate > 0 and config['KEEP_SLOWEST'] > 0:
+            os.makedirs(config['PROFILE_DIR'], exist_ok=True)
+            self.slowest = SlowestProfiles(config['PROFILE_DIR'], config['KEEP_SLOWEST'])
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        profiler = None
+        if self.slowest is not None and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                if profiler is not None:
+                    try:
+                        profiler.enable()
+                    except ValueError:
+                        # Another profiler is active (Python 3.12+ allows one per process)
+                        profiler = None
+                    else:
+                        stack.callback(profiler.disable)
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            _current.reset(token)
+
+        dump = None
+        if profiler is not None:
+            dump = self.slowest.offer(duration, request, profiler)
+        response['Server-Timing'] = self.server_timing(duration, profile)
+        self.log(request, response, duration, profile, dump)
+        return response
+
+    def server_timing(self, duration: float, profile: RequestProfile) -> str:
+        metrics = [
+            f'total;dur={duration * 1000:.2f}',
+            f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries"',
+        ]
+        metrics.extend(
+            f'{name};dur={seconds * 1000:.2f}' for name, seconds in profile.spans.items()
+        )
+        return ', '.join(metrics)
+
+    def log(self, request, response, duration: float, profile: RequestProfile,
+            dump: Optional[str]) -> None:
+        match = request.resolver_match
+        record: Dict[str, Any] = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': profile.queries,
+            'db_ms': round(profile.db_time * 1000, 2),
+            'spans_ms': {name: round(s * 1000, 2) for name, s in profile.spans.items()},
+        }
+        if dump:
+            record['profile'] = dump
+        logger.info(json.dumps(record), extra={'request_profile': record})
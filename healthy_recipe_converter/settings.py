@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First so its timings cover the rest of the stack; removes itself when
+    # REQUEST_PROFILING['ENABLED'] is False
+    'healthy_recipe_converter.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -129,10 +133,85 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.DenylistJWTAuthentication',
     ),
 }
 
+# When True, views using users.authentication.StatelessJWTAuthentication build
+# the request user from token claims instead of loading it from the database.
+JWT_STATELESS_AUTH = False
+
+# Serve the convert and read endpoints from native async views (recipes.async_views).
+# Only worthwhile under an ASGI server; set ASYNC_VIEWS=1 in the environment.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# Default for POST /api/recipes/grocery-lists/: when True, items are generated
+# by the run_grocery_jobs worker and the request returns 202 with a job URL.
+# Clients can override per request with ?background=1 or ?background=0.
+GROCERY_LIST_BACKGROUND = False
+
+# Rows fetched per round trip by the streaming export endpoints
+EXPORT_CHUNK_SIZE = 2000
+
+# Threads available to async views for CPU-bound recipe conversion.
+ASYNC_CONVERT_WORKERS = 4
+
+# GroceryItem's ordering index includes non-key columns to make it covering on
+# PostgreSQL; SQLite ignores them, which is fine for development.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+# Local memory by default; point 'default' at Redis or Memcached in production
+# so the conversion and response caches are shared between processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Rendered public recipe detail, list and search responses (see
+# recipes.response_cache), invalidated when a recipe is saved or deleted.
+RECIPE_RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 10,
+}
+
+# Recipe conversion cache: an in-process LRU of LRU_SIZE entries in front of
+# the CACHE_ALIAS backend. Keys include the substitution rule-set version.
+CONVERSION_CACHE = {
+    'LRU_SIZE': 1024,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# Per-request timing (see healthy_recipe_converter.profiling): a Server-Timing
+# header and a JSON log line with SQL stats and named spans. SAMPLE_RATE of
+# requests also run under cProfile; dumps of the KEEP_SLOWEST slowest are kept
+# in PROFILE_DIR. Set REQUEST_PROFILING=1 in the environment to enable.
+REQUEST_PROFILING = {
+    'ENABLED': os.environ.get('REQUEST_PROFILING') == '1',
+    'SAMPLE_RATE': 0.0,
+    'PROFILE_DIR': BASE_DIR / 'profiles',
+    'KEEP_SLOWEST': 20,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'healthy_recipe_converter.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Seconds a user's subscription flags stay cached (see users.entitlements)
+ENTITLEMENTS_CACHE_TIMEOUT = 60
+
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
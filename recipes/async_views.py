@@ -0,0 +1,216 @@
+"""
+Native async versions of the read-heavy endpoints, for ASGI deployments.
+
+Enabled with the ASYNC_VIEWS setting (see README). Reads are served from
+async handlers so a slow client only holds a coroutine, not a worker thread.
+Database work goes through Django's async ORM. Conversion is CPU-bound, so
+it runs on a small fixed thread pool instead of the event loop. Writes are
+delegated unchanged to the synchronous DRF views.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from .conditional import evaluate_conditional, set_validators
+from .models import Recipe, GroceryList
+from .pagination import RecipeCursorPagination
+from .response_cache import cached_response, response_cache
+from .serializers import (
+    RecipeSerializer, RecipeListSerializer,
+    SavedRecipeSerializer, GroceryListSerializer
+)
+from .views import (
+    cached_convert_recipe, conversion_input, recipe_list_queryset, saved_recipe_queryset,
+    grocery_list_queryset,
+    recipe_page_validators, saved_recipe_validators, grocery_lists_validators,
+    grocery_list_validators,
+    RecipeListCreateView, SavedRecipeListView,
+    GroceryListView, GroceryListDetailView
+)
+from users.authentication import StatelessJWTAuthentication
+
+convert_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_CONVERT_WORKERS,
+    thread_name_prefix='recipe-convert'
+)
+
+async def cache_miss(key: str, response: HttpResponse, etag: str,
+                     timestamp: Optional[int]) -> HttpResponse:
+    """Finish a response-cache miss the way the sync views' mixins do."""
+    set_validators(response, etag, timestamp)
+    await sync_to_async(response_cache.store)(key, response)
+    response['X-Response-Cache'] = 'miss'
+    return response
+
+async def conditional_get(request, validators: Optional[Tuple[Any, Any]],
+                          render: Callable[[], Awaitable[HttpResponse]]) -> HttpResponse:
+    """ConditionalGetMixin.get for per-user async views, which vary on Authorization."""
+    if validators is None:
+        return await render()
+    etag, timestamp, response = evaluate_conditional(request, *validators)
+    if response is None:
+        response = await render()
+    set_validators(response, etag, timestamp, vary_on_authorization=True)
+    return response
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Base for async views: authenticates like the DRF views do and delegates
+    any method without an async handler to `sync_view`.
+    """
+    sync_view = None
+    login_required = False
+
+    async def authenticate(self, request) -> Optional[Any]:
+        authentication = StatelessJWTAuthentication()
+        if settings.JWT_STATELESS_AUTH:
+            result = authentication.authenticate(request)
+        else:
+            result = await sync_to_async(authentication.authenticate)(request)
+        return result[0] if result else None
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if handler is None or request.method not in ('GET', 'HEAD', 'POST'):
+            if self.sync_view is None:
+                return self.http_method_not_allowed(request, *args, **kwargs)
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+        try:
+            request.api_user = await self.authenticate(request)
+        except exceptions.APIException as exc:
+            # Same body shape as DRF's exception handler
+            data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            return JsonResponse(data, status=exc.status_code)
+        if self.login_required and request.api_user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+        return await handler(request, *args, **kwargs)
+
+class AsyncRecipeConvertView(AsyncAPIView):
+    async def post(self, request) -> JsonResponse:
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return JsonResponse({'detail': 'JSON parse error'}, status=400)
+        else:
+            data = request.POST
+        try:
+            ingredients, instructions = conversion_input(data)
+        except exceptions.ValidationError as exc:
+            return JsonResponse(exc.detail, status=400)
+        loop = asyncio.get_running_loop()
+        result, cache_status = await loop.run_in_executor(
+            convert_executor, cached_convert_recipe, ingredients, instructions
+        )
+        response = JsonResponse(result)
+        response['X-Conversion-Cache'] = cache_status
+        return response
+
+class AsyncRecipeListView(AsyncAPIView):
+    sync_view = staticmethod(RecipeListCreateView.as_view())
+
+    async def get(self, request) -> HttpResponse:
+        key = await sync_to_async(response_cache.page_key)(request.get_full_path())
+        entry = await sync_to_async(response_cache.get)(key)
+        if entry is not None:
+            return cached_response(request, entry)
+
+        drf_request = Request(request)
+        try:
+            validators = await sync_to_async(recipe_page_validators)(drf_request)
+        except exceptions.NotFound as exc:
+            return JsonResponse({'detail': exc.detail}, status=exc.status_code)
+        etag, timestamp, response = evaluate_conditional(request, *validators)
+        if response is None:
+            fields = RecipeListSerializer.requested_fields(drf_request)
+            paginator = RecipeCursorPagination()
+            page = await sync_to_async(paginator.paginate_queryset)(
+                recipe_list_queryset(fields), drf_request
+            )
+            serializer = RecipeListSerializer(page, many=True, context={'request': drf_request})
+            response = JsonResponse(paginator.get_paginated_response(serializer.data).data)
+        return await cache_miss(key, response, etag, timestamp)
+
+    async def post(self, request):
+        return await sync_to_async(self.sync_view)(request)
+
+class AsyncRecipeDetailView(AsyncAPIView):
+    async def get(self, request, pk: int) -> HttpResponse:
+        key = await sync_to_async(response_cache.detail_key)(pk)
+        entry = await sync_to_async(response_cache.get)(key)
+        if entry is not None:
+            return cached_response(request, entry)
+
+        not_found = JsonResponse({'detail': 'No Recipe matches the given query.'}, status=404)
+        updated = await Recipe.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+        if updated is None:
+            return not_found
+        etag, timestamp, response = evaluate_conditional(request, updated, updated)
+        if response is None:
+            try:
+                recipe = await Recipe.objects.aget(pk=pk)
+            except Recipe.DoesNotExist:
+                return not_found
+            response = JsonResponse(RecipeSerializer(recipe).data)
+        return await cache_miss(key, response, etag, timestamp)
+
+class AsyncSavedRecipeListView(AsyncAPIView):
+    sync_view = staticmethod(SavedRecipeListView.as_view())
+    login_required = True
+
+    async def get(self, request) -> HttpResponse:
+        async def render():
+            saved = [
+                saved async for saved in saved_recipe_queryset(request.api_user)
+            ]
+            return JsonResponse(SavedRecipeSerializer(saved, many=True).data, safe=False)
+
+        validators = await sync_to_async(saved_recipe_validators)(request.api_user)
+        return await conditional_get(request, validators, render)
+
+    async def post(self, request):
+        return await sync_to_async(self.sync_view)(request)
+
+class AsyncGroceryListView(AsyncAPIView):
+    sync_view = staticmethod(GroceryListView.as_view())
+    login_required = True
+
+    async def get(self, request) -> HttpResponse:
+        async def render():
+            grocery_lists = [
+                grocery_list async for grocery_list in grocery_list_queryset(request.api_user)
+            ]
+            return JsonResponse(GroceryListSerializer(grocery_lists, many=True).data, safe=False)
+
+        validators = await sync_to_async(grocery_lists_validators)(request.api_user)
+        return await conditional_get(request, validators, render)
+
+    async def post(self, request):
+        return await sync_to_async(self.sync_view)(request)
+
+class AsyncGroceryListDetailView(AsyncAPIView):
+    sync_view = staticmethod(GroceryListDetailView.as_view())
+    login_required = True
+
+    async def get(self, request, pk: int) -> HttpResponse:
+        async def render():
+            try:
+                grocery_list = await grocery_list_queryset(request.api_user).aget(pk=pk)
+            except GroceryList.DoesNotExist:
+                return JsonResponse({'detail': 'No GroceryList matches the given query.'}, status=404)
+            return JsonResponse(GroceryListSerializer(grocery_list).data)
+
+        validators = await sync_to_async(grocery_list_validators)(request.api_user, pk)
+        return await conditional_get(request, validators, render)
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the parser, combiner, converter and API endpoints.
+
+Run with `python manage.py run_benchmarks`. Inputs come from a seeded
+generator (see `data`), so two runs on the same code measure the same work.
+"""
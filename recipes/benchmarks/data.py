@@ -0,0 +1,69 @@
+import random
+from typing import Any, Dict, List
+from recipes.utils.ingredient_parser import categories, convert_fraction_to_float
+
+QUANTITIES = ['1', '2', '3', '4', '1/2', '1/4', '3/4', '1.5', '0.5', '250', '']
+UNITS = [
+    'cup', 'cups', 'tbsp', 'tablespoons', 'tsp', 'teaspoon', 'oz', 'ounces',
+    'lb', 'lbs', 'g', 'grams', 'kg', 'ml', 'l', 'pinch', 'clove', 'can', ''
+]
+MODIFIERS = ['', '', '', 'fresh', 'chopped', 'large', 'organic', 'low-fat', 'diced']
+NOTES = ['', '', '', '', ' (softened)', ' (optional)', ', to taste', ' (about 2 cups)']
+# Words that SUBSTITUTIONS rewrite, so the converter has real work to do
+SUBSTITUTED = ['whole milk', 'heavy cream', 'butter', 'sugar', 'white flour', 'vegetable oil']
+STEPS = [
+    'Preheat the oven to 350F.',
+    'Whisk the {a} with the {b} until smooth.',
+    'Fold in the {a} and set aside.',
+    'Melt the {a} over low heat, then stir in the {b}.',
+    'Bake for 25 minutes and let cool.',
+    'Season with {a} and serve.',
+]
+
+
+class RecipeGenerator:
+    """Deterministic synthetic recipes; the same seed gives the same output."""
+
+    def __init__(self, seed: int = 1234):
+        self.random = random.Random(seed)
+        self.names = [item for items in categories.values() for item in items] + SUBSTITUTED
+
+    def ingredient_name(self) -> str:
+        modifier = self.random.choice(MODIFIERS)
+        name = self.random.choice(self.names)
+        return f'{modifier} {name}'.strip()
+
+    def ingredient_line(self) -> str:
+        quantity = self.random.choice(QUANTITIES)
+        unit = self.random.choice(UNITS) if quantity else ''
+        parts = [part for part in (quantity, unit, self.ingredient_name()) if part]
+        return '- ' * (self.random.random() < 0.2) + ' '.join(parts) + self.random.choice(NOTES)
+
+    def ingredient_lines(self, count: int) -> List[str]:
+        return [self.ingredient_line() for _ in range(count)]
+
+    def instructions(self, count: int) -> str:
+        return '\n'.join(
+            self.random.choice(STEPS).format(
+                a=self.random.choice(self.names), b=self.random.choice(SUBSTITUTED)
+            ) for _ in range(count)
+        )
+
+    def recipe(self, lines: int = 10) -> Dict[str, Any]:
+        return {
+            'title': f'Recipe {self.random.randrange(10 ** 6)}',
+            'ingredients': '\n'.join(self.ingredient_lines(lines)),
+            'instructions': self.instructions(max(1, lines // 2)),
+        }
+
+    def parsed_ingredients(self, count: int) -> List[Dict[str, Any]]:
+        """Rows shaped like the input of combineIngredients."""
+        rows = []
+        for _ in range(count):
+            quantity = self.random.choice(QUANTITIES)
+            rows.append({
+                'quantity': convert_fraction_to_float(quantity) if quantity else None,
+                'unit': self.random.choice(UNITS) or None,
+                'ingredient': self.ingredient_name(),
+            })
+        return rows
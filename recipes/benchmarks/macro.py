@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+from itertools import count
+from typing import Iterator, List
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from recipes.models import Recipe, GroceryList
+from recipes.response_cache import response_cache
+from recipes.views import conversion_cache
+from users.models import Profile
+from users.tokens import tokens_for_user
+from .data import RecipeGenerator
+from .runner import Benchmark
+
+RECIPES = 200
+GROCERY_LISTS = 20
+RECIPES_PER_LIST = 5
+
+
+@contextmanager
+def benchmark_environment() -> Iterator[None]:
+    """
+    A throwaway test database and a private local-memory cache, so macro
+    benchmarks never touch real data or a shared cache backend.
+    """
+    setup_test_environment()
+    caches = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmarks',
+    }}
+    with override_settings(CACHES=caches):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+def _check(response, expected: int = 200):
+    if response.status_code != expected:
+        raise AssertionError(f'{response.status_code}: {response.content[:200]!r}')
+    return response
+
+
+def macro_benchmarks(seed: int, number: int = 20) -> List[Benchmark]:
+    """End-to-end requests through the Django test client.
+
+    Must be built and run inside benchmark_environment().
+    """
+    generator = RecipeGenerator(seed)
+    user = get_user_model().objects.create_user('benchmark', 'benchmark@example.com', 'password')
+    Profile.objects.create(user=user, paid_subscription=True)
+    recipes = [Recipe.objects.create(user=user, **generator.recipe(10)) for _ in range(RECIPES)]
+    for index in range(GROCERY_LISTS):
+        grocery_list = GroceryList.objects.create(user=user, name=f'List {index}')
+        grocery_list.recipes.set(recipes[index::GROCERY_LISTS][:RECIPES_PER_LIST])
+        grocery_list.generate_items()
+
+    anonymous = Client()
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+    convert_bodies = [generator.recipe(10) for _ in range(64)]
+    distinct = count()
+    recipe_ids = [recipe.pk for recipe in recipes]
+
+    def convert_miss():
+        body = dict(convert_bodies[next(distinct) % len(convert_bodies)])
+        _check(anonymous.post('/api/recipes/convert/', body, content_type='application/json'))
+
+    def clear_conversion_cache():
+        conversion_cache.clear()
+        caches[conversion_cache.cache_alias].clear()
+
+    def create_grocery_list():
+        start = next(distinct) % (len(recipe_ids) - RECIPES_PER_LIST)
+        _check(client.post('/api/recipes/grocery-lists/', {
+            'name': 'Benchmark',
+            'recipe_ids': recipe_ids[start:start + RECIPES_PER_LIST],
+        }, content_type='application/json'), 201)
+
+    detail_url = f'/api/recipes/recipes/{recipe_ids[0]}/'
+    return [
+        Benchmark('api.convert.miss', convert_miss, number, setup=clear_conversion_cache),
+        Benchmark(
+            'api.convert.hit',
+            lambda: _check(anonymous.post(
+                '/api/recipes/convert/', convert_bodies[0], content_type='application/json'
+            )),
+            number
+        ),
+        Benchmark(
+            'api.recipe_list',
+            lambda: _check(anonymous.get('/api/recipes/recipes/')),
+            number,
+            setup=response_cache.invalidate_pages
+        ),
+        Benchmark(
+            'api.recipe_list.cached',
+            lambda: _check(anonymous.get('/api/recipes/recipes/')),
+            number
+        ),
+        Benchmark(
+            'api.recipe_detail',
+            lambda: _check(anonymous.get(detail_url)),
+            number,
+            setup=lambda: response_cache.invalidate_recipe(recipe_ids[0])
+        ),
+        Benchmark(
+            'api.grocery_lists.list',
+            lambda: _check(client.get('/api/recipes/grocery-lists/')),
+            number
+        ),
+        # Last, since it adds lists
+        Benchmark('api.grocery_list.create', create_grocery_list, number),
+    ]
@@ -0,0 +1,48 @@
+from typing import List
+from recipes.utils.ingredient_parser import (
+    category_matcher, categorizeIngredient, combineIngredients, parseIngredient
+)
+from recipes.views import convert_recipe
+from .data import RecipeGenerator
+from .runner import Benchmark
+
+SIZES = (10, 100, 1000)
+
+
+def micro_benchmarks(seed: int, sizes=SIZES) -> List[Benchmark]:
+    """Pure-Python hot paths, each over inputs of several sizes."""
+    generator = RecipeGenerator(seed)
+    benchmarks = []
+    for size in sizes:
+        number = max(1, 1000 // size)
+        lines = generator.ingredient_lines(size)
+        names = [generator.ingredient_name() for _ in range(size)]
+        rows = generator.parsed_ingredients(size)
+        ingredients = '\n'.join(lines)
+        instructions = generator.instructions(size)
+
+        benchmarks += [
+            Benchmark(
+                f'parseIngredient[{size}]',
+                lambda lines=lines: [parseIngredient(line) for line in lines],
+                number
+            ),
+            # The matcher memoizes; clear it so every sample does the work
+            Benchmark(
+                f'categorizeIngredient[{size}]',
+                lambda names=names: [categorizeIngredient(name) for name in names],
+                number,
+                setup=category_matcher.match.cache_clear
+            ),
+            Benchmark(
+                f'combineIngredients[{size}]',
+                lambda rows=rows: combineIngredients(rows),
+                number
+            ),
+            Benchmark(
+                f'substitutions[{size}]',
+                lambda i=ingredients, s=instructions: convert_recipe(i, s),
+                number
+            ),
+        ]
+    return benchmarks
@@ -0,0 +1,105 @@
+import gc
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import django
+
+
+class Benchmark:
+    """
+    A named operation to time.
+
+    Without `setup`, `func` is run `number` times in a tight loop per sample.
+    With `setup`, each call is timed on its own after an untimed `setup()`,
+    for operations that need fresh state (for example an emptied cache).
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], number: int = 1,
+                 setup: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.func = func
+        self.number = number
+        self.setup = setup
+
+    def sample(self) -> float:
+        """Seconds per call, averaged over `number` calls."""
+        if self.setup is None:
+            start = time.perf_counter()
+            for _ in range(self.number):
+                self.func()
+            return (time.perf_counter() - start) / self.number
+        total = 0.0
+        for _ in range(self.number):
+            self.setup()
+            start = time.perf_counter()
+            self.func()
+            total += time.perf_counter() - start
+        return total / self.number
+
+    def run(self, repeat: int) -> Dict[str, Any]:
+        self.sample()  # warm-up: imports, caches, lazy compilation
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            samples = [self.sample() for _ in range(repeat)]
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return {
+            'median': statistics.median(samples),
+            'min': min(samples),
+            'max': max(samples),
+            'repeat': repeat,
+            'number': self.number,
+        }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int,
+                   report: Callable[[str, Dict[str, Any]], None] = lambda name, result: None
+                   ) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = benchmark.run(repeat)
+        report(benchmark.name, results[benchmark.name])
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare medians of benchmarks present in both runs.
+
+    Each row has the relative change (positive is slower) and whether it
+    exceeds `threshold`, e.g. 0.1 for 10% slower.
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        before = baseline[name]['median']
+        after = current[name]['median']
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            'name': name,
+            'baseline': before,
+            'current': after,
+            'change': change,
+            'regressed': change > threshold,
+        })
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f}{unit}'
+    return f'{seconds / 1e-9:.0f}ns'
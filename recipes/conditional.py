@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def weak_etag(*parts: Any) -> str:
+    """A weak ETag over the repr of `parts`."""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """The most recent of `timestamps`, ignoring None."""
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(present) if present else None
+
+
+def evaluate_conditional(request: Any, version: Any, last_modified: Optional[datetime]
+                         ) -> Tuple[str, Optional[int], Optional[HttpResponse]]:
+    """
+    The ETag and Last-Modified timestamp for a response, and the 304 (or 412)
+    response to send instead if the request's preconditions already match.
+    """
+    etag = weak_etag(version, request.get_full_path())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response: HttpResponse, etag: str, timestamp: Optional[int],
+                   vary_on_authorization: bool = False) -> None:
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        if vary_on_authorization:
+            patch_vary_headers(response, ['Authorization'])
+
+
+class ConditionalGetMixin:
+    """
+    Answers If-None-Match and If-Modified-Since on GET before the view loads
+    or serializes anything.
+
+    Views override `get_validators()`, which should run one cheap aggregate
+    query and return `(version, last_modified)`, or None to skip the check.
+    `version` is any value that changes whenever the response body would. It
+    is hashed with the request path (including the query string) into a weak
+    ETag. `last_modified` may be
+    None, for collections where a deletion would not move any `updated_at`
+    forward; those responses carry only an ETag.
+    """
+    # Set on views whose responses depend on the authenticated user
+    vary_on_authorization = False
+
+    def get_validators(self) -> Optional[Tuple[Any, Optional[datetime]]]:
+        """None (the default) serves the request without validators."""
+        return None
+
+    def get(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        etag, timestamp, response = evaluate_conditional(request, *validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        set_validators(response, etag, timestamp, self.vary_on_authorization)
+        return response
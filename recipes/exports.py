@@ -0,0 +1,51 @@
+import csv
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class _Echo:
+    """A file-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def ndjson_lines(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode each record as one JSON line."""
+    encoder = DjangoJSONEncoder()
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def csv_lines(fieldnames: Sequence[str], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode rows as CSV lines, header first."""
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames, extrasaction='ignore')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def nest_rows(rows: Iterable[Dict[str, Any]], parent_fields: Sequence[str],
+              child_prefix: str, child_key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Fold flat parent/child join rows, ordered by parent, into one record per
+    parent with its children in a list under `child_key`. Child columns are
+    those starting with `child_prefix`, which is stripped. A row whose child
+    columns are all None (an outer join with no children) adds no child.
+    Only one parent's rows are held at a time.
+    """
+    for _, group in groupby(rows, key=lambda row: row[parent_fields[0]]):
+        record: Dict[str, Any] = {}
+        children: List[Dict[str, Any]] = []
+        for row in group:
+            if not record:
+                record = {field: row[field] for field in parent_fields}
+            child = {
+                field[len(child_prefix):]: value
+                for field, value in row.items() if field.startswith(child_prefix)
+            }
+            if any(value is not None for value in child.values()):
+                children.append(child)
+        record[child_key] = children
+        yield record
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.models import Recipe, ParsedIngredient
+
+class Command(BaseCommand):
+    help = 'Populates ParsedIngredient rows for existing recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild rows for every recipe, not only those without any'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        recipes = Recipe.objects.only('id', 'converted_ingredients').order_by('pk')
+        if not options['all']:
+            recipes = recipes.filter(parsed_ingredients__isnull=True)
+
+        last_pk = 0
+        total_recipes = 0
+        total_rows = 0
+        while True:
+            batch = list(recipes.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            rows = []
+            for recipe in batch:
+                rows.extend(ParsedIngredient.build_for_recipe(recipe))
+            with transaction.atomic():
+                ParsedIngredient.objects.filter(recipe__in=batch).delete()
+                ParsedIngredient.objects.bulk_create(rows)
+
+            total_recipes += len(batch)
+            total_rows += len(rows)
+            self.stdout.write(f'Parsed {total_recipes} recipes...')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully parsed {total_rows} ingredients from {total_recipes} recipes'
+            )
+        )
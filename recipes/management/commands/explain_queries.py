@@ -0,0 +1,93 @@
+import re
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from recipes.models import Recipe, GroceryList
+from recipes.pagination import RecipeCursorPagination
+from recipes.serializers import RecipeListSerializer
+from recipes.views import (
+    RecipeDetailView, grocery_item_queryset, grocery_list_queryset,
+    recipe_list_queryset, saved_recipe_queryset
+)
+
+# Plan fragments that mean a query is not served from an index, per backend
+SQLITE_WARNINGS = {
+    'seq scan': lambda line: re.search(r'\bSCAN\b', line) and 'USING' not in line,
+    'sort': lambda line: 'USE TEMP B-TREE' in line,
+}
+POSTGRESQL_WARNINGS = {
+    'seq scan': lambda line: 'Seq Scan' in line,
+    'sort spilled to disk': lambda line: 'Sort Method: external' in line,
+}
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the main query of each API endpoint and flags table scans and sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username whose data the per-user queries should use (default: first user)'
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Exit with an error if any query is flagged'
+        )
+
+    def get_queries(self, user):
+        """The querysets the views build, narrowed the way each view narrows them."""
+        recipe = Recipe.objects.order_by('pk').first()
+        grocery_list = GroceryList.objects.filter(user=user).first()
+        page_size = RecipeCursorPagination.page_size
+        return {
+            # RecipeCursorPagination orders the first page and reads one extra row
+            'recipe-list': recipe_list_queryset(RecipeListSerializer.default_fields).order_by(
+                *RecipeCursorPagination.ordering
+            )[:page_size + 1],
+            'recipe-detail': RecipeDetailView.queryset.filter(pk=recipe.pk if recipe else 0),
+            'saved-recipe-list': saved_recipe_queryset(user),
+            'grocery-list': grocery_list_queryset(user),
+            # The items prefetch of grocery_list_queryset, for one list
+            'grocery-list-items': grocery_item_queryset().filter(
+                grocery_list__in=[grocery_list.pk if grocery_list else 0]
+            ),
+        }
+
+    def handle(self, *args, **options):
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User {options["user"]} does not exist')
+        else:
+            user = User.objects.order_by('pk').first()
+            if user is None:
+                raise CommandError('No users exist; create one or pass --user')
+
+        if connection.vendor == 'postgresql':
+            warnings = POSTGRESQL_WARNINGS
+            explain_options = {'analyze': True, 'buffers': True}
+        else:
+            warnings = SQLITE_WARNINGS
+            explain_options = {}
+
+        flagged = 0
+        for name, queryset in self.get_queries(user).items():
+            plan = queryset.explain(**explain_options)
+            problems = sorted({
+                problem
+                for line in plan.splitlines()
+                for problem, matches in warnings.items()
+                if matches(line)
+            })
+            if problems:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'{name}: {", ".join(problems)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+            if options['verbosity'] > 1 or problems:
+                self.stdout.write(plan)
+
+        if flagged and options['strict']:
+            raise CommandError(f'{flagged} queries need attention')
@@ -0,0 +1,224 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from recipes.models import ImportProgress, Recipe, ParsedIngredient
+from recipes.response_cache import response_cache
+
+
+FIELDS = ('title', 'ingredients', 'instructions')
+
+
+def _init_worker() -> None:
+    django.setup()
+
+
+def prepare_batch(records: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Convert and parse a batch of raw records in a worker process.
+
+    Returns the prepared recipes, each with its parsed ingredient rows, and
+    an error message for every record that was skipped.
+    """
+    from recipes.views import convert_recipe, substitution_engine
+
+    prepared = []
+    errors = []
+    for line, record in records:
+        if not isinstance(record, dict):
+            errors.append(f'record {line}: not a JSON object')
+            continue
+        invalid = [
+            field for field in FIELDS
+            if record.get(field) is not None and not isinstance(record[field], str)
+        ]
+        if invalid:
+            errors.append(f"record {line}: {', '.join(invalid)} must be text")
+            continue
+        title = (record.get('title') or '').strip()
+        ingredients = record.get('ingredients') or ''
+        instructions = record.get('instructions') or ''
+        if not title or not ingredients:
+            errors.append(f'record {line}: title and ingredients are required')
+            continue
+
+        converted = convert_recipe(ingredients, instructions)
+        recipe = Recipe(title=title[:255], ingredients=ingredients,
+                        instructions=instructions, **converted)
+        parsed = [
+            (row.position, row.quantity, row.unit, row.name, row.category)
+            for row in ParsedIngredient.build_for_recipe(recipe)
+        ]
+        prepared.append({
+            'title': recipe.title,
+            'ingredients': ingredients,
+            'instructions': instructions,
+            **converted,
+            'conversion_version': substitution_engine.version,
+            'parsed': parsed,
+        })
+    return prepared, errors
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports recipes from a JSONL or CSV file (or stdin)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument(
+            '--format',
+            choices=['jsonl', 'csv'],
+            help='Input format; guessed from the file extension by default'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Conversion processes; 0 converts in this process'
+        )
+        parser.add_argument('--user', help='Username that will own the imported recipes')
+        parser.add_argument(
+            '--checkpoint',
+            help='Name under which progress is recorded in the database '
+                 '(default: the absolute input path; required to resume stdin)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.user_id = None
+        if options['user']:
+            try:
+                self.user_id = get_user_model().objects.get(username=options['user']).pk
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+
+        checkpoint = options['checkpoint'] or (None if path == '-' else os.path.abspath(path))
+        done = self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f'Resuming after {done} records')
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = self.read_records(stream, fmt)
+            batches = self.batches(records, done, batch_size)
+            self.imported = 0
+            self.skipped = 0
+            self.started = time.monotonic()
+            if options['workers'] > 0:
+                # Workers are forked; don't hand them this process's connections
+                connections.close_all()
+                with ProcessPoolExecutor(options['workers'], initializer=_init_worker) as pool:
+                    self.run_pipelined(pool, batches, checkpoint, options['workers'] * 2)
+            else:
+                for end, batch in batches:
+                    self.save_batch(end, prepare_batch(batch), checkpoint)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.imported:
+            response_cache.invalidate_pages()
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} recipes in {elapsed:.1f}s '
+            f'({self.imported / elapsed if elapsed else 0:.0f}/s), skipped {self.skipped}'
+        ))
+
+    def read_records(self, stream, fmt: str) -> Iterator[Tuple[int, Any]]:
+        if fmt == 'csv':
+            yield from enumerate(csv.DictReader(stream), start=1)
+            return
+        number = 0
+        for text in stream:
+            if not text.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(text)
+            except ValueError:
+                yield number, None
+
+    def batches(self, records, done: int, batch_size: int) -> Iterator[Tuple[int, list]]:
+        """Group records after the first `done` into (records consumed, batch) pairs."""
+        batch = []
+        end = 0
+        for end, record in records:
+            if end <= done:
+                continue
+            batch.append((end, record))
+            if len(batch) == batch_size:
+                yield end, batch
+                batch = []
+        if batch:
+            yield end, batch
+
+    def run_pipelined(self, pool, batches, checkpoint: Optional[str], depth: int) -> None:
+        """Keep up to `depth` batches converting, but commit them in input order."""
+        pending = deque()
+        for end, batch in batches:
+            pending.append((end, pool.submit(prepare_batch, batch)))
+            if len(pending) >= depth:
+                end, future = pending.popleft()
+                self.save_batch(end, future.result(), checkpoint)
+        while pending:
+            end, future = pending.popleft()
+            self.save_batch(end, future.result(), checkpoint)
+
+    def save_batch(self, end: int, result, checkpoint: Optional[str]) -> None:
+        prepared, errors = result
+        for error in errors:
+            self.stderr.write(error)
+
+        with transaction.atomic():
+            recipes = Recipe.objects.bulk_create([
+                Recipe(user_id=self.user_id, **{
+                    field: value for field, value in item.items() if field != 'parsed'
+                }) for item in prepared
+            ])
+            # bulk_create skips post_save, so parsed rows are written here
+            ParsedIngredient.objects.bulk_create([
+                ParsedIngredient(
+                    recipe=recipe, position=position, quantity=quantity,
+                    unit=unit, name=name, category=category
+                )
+                for recipe, item in zip(recipes, prepared)
+                for position, quantity, unit, name, category in item['parsed']
+            ])
+            # Committed with the batch, so a crash can't split the two
+            self.write_checkpoint(checkpoint, end)
+
+        self.imported += len(prepared)
+        self.skipped += len(errors)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'Imported {self.imported} recipes '
+            f'({self.imported / elapsed if elapsed else 0:.0f}/s), {end} records read'
+        )
+
+    def read_checkpoint(self, checkpoint: Optional[str]) -> int:
+        if not checkpoint:
+            return 0
+        progress = ImportProgress.objects.filter(name=checkpoint[:255]).first()
+        return progress.records if progress else 0
+
+    def write_checkpoint(self, checkpoint: Optional[str], done: int) -> None:
+        if not checkpoint:
+            return
+        ImportProgress.objects.update_or_create(
+            name=checkpoint[:255], defaults={'records': done}
+        )
@@ -0,0 +1,188 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from recipes.models import Recipe, ParsedIngredient
+from recipes.response_cache import response_cache
+from recipes.views import substitution_engine
+
+
+def _init_worker() -> None:
+    django.setup()
+
+
+def reconvert_batch(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert a batch of recipes with the current rules in a worker process.
+
+    Returns one result per row: the new converted fields, and parsed
+    ingredient rows when the converted ingredients changed (None otherwise).
+    """
+    from recipes.views import convert_recipe
+
+    results = []
+    for row in rows:
+        converted = convert_recipe(row['ingredients'], row['instructions'])
+        parsed = None
+        if converted['converted_ingredients'] != row['converted_ingredients']:
+            recipe = Recipe(converted_ingredients=converted['converted_ingredients'])
+            parsed = [
+                (item.position, item.quantity, item.unit, item.name, item.category)
+                for item in ParsedIngredient.build_for_recipe(recipe)
+            ]
+        results.append({
+            'pk': row['pk'],
+            'updated_at': row['updated_at'],
+            'changed': (
+                parsed is not None
+                or converted['converted_instructions'] != row['converted_instructions']
+            ),
+            'parsed': parsed,
+            **converted,
+        })
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Re-converts recipes whose conversion predates the current substitution rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Conversion processes; 0 converts in this process'
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=0.0,
+            help='Seconds to pause after each written batch, to spare a live database'
+        )
+        parser.add_argument('--user', help='Only recipes owned by this username')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Convert and report what would change without writing'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        self.version = substitution_engine.version
+        self.dry_run = options['dry_run']
+        self.throttle = options['throttle']
+
+        stale = Recipe.objects.exclude(conversion_version=self.version)
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+            stale = stale.filter(user=user)
+        self.stale = stale
+
+        self.stdout.write(f'Rule-set version {self.version}: {stale.count()} stale recipes')
+        self.checked = 0
+        self.changed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+        batches = self.batches(options['batch_size'])
+        if options['workers'] > 0:
+            # Workers are forked; don't hand them this process's connections
+            connections.close_all()
+            with ProcessPoolExecutor(options['workers'], initializer=_init_worker) as pool:
+                pending = deque()
+                for batch in batches:
+                    pending.append(pool.submit(reconvert_batch, batch))
+                    if len(pending) >= options['workers'] * 2:
+                        self.save_batch(pending.popleft().result())
+                while pending:
+                    self.save_batch(pending.popleft().result())
+        else:
+            for batch in batches:
+                self.save_batch(reconvert_batch(batch))
+
+        elapsed = time.monotonic() - self.started
+        verb = 'Would re-convert' if self.dry_run else 'Re-converted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {self.changed} of {self.checked} stale recipes in {elapsed:.1f}s'
+            f' ({self.checked / elapsed if elapsed else 0:.0f}/s); '
+            f'{self.skipped} edited meanwhile and skipped'
+        ))
+
+    def batches(self, batch_size: int):
+        """Stale rows in primary key order, read one short query at a time."""
+        last_pk = 0
+        while True:
+            batch = list(self.stale.filter(pk__gt=last_pk).order_by('pk').values(
+                'pk', 'updated_at', 'ingredients', 'instructions',
+                'converted_ingredients', 'converted_instructions'
+            )[:batch_size])
+            if not batch:
+                return
+            last_pk = batch[-1]['pk']
+            yield batch
+
+    def save_batch(self, results: List[Dict[str, Any]]) -> None:
+        self.checked += len(results)
+        if self.dry_run:
+            self.changed += sum(result['changed'] for result in results)
+            return
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock only this batch's rows, and leave alone any recipe saved
+            # since it was read; its own save will have stamped a version.
+            current = dict(Recipe.objects.select_for_update().filter(
+                pk__in=[result['pk'] for result in results]
+            ).values_list('pk', 'updated_at'))
+            fresh = [r for r in results if current.get(r['pk']) == r['updated_at']]
+            self.skipped += len(results) - len(fresh)
+
+            changed = [r for r in fresh if r['changed']]
+            Recipe.objects.bulk_update([
+                Recipe(
+                    pk=r['pk'],
+                    converted_ingredients=r['converted_ingredients'],
+                    converted_instructions=r['converted_instructions'],
+                    conversion_version=self.version,
+                    updated_at=now
+                ) for r in changed
+            ], ['converted_ingredients', 'converted_instructions', 'conversion_version', 'updated_at'])
+            # Unchanged output only needs the new version stamp
+            Recipe.objects.filter(
+                pk__in=[r['pk'] for r in fresh if not r['changed']]
+            ).update(conversion_version=self.version)
+
+            reparsed = [r for r in changed if r['parsed'] is not None]
+            ParsedIngredient.objects.filter(recipe_id__in=[r['pk'] for r in reparsed]).delete()
+            ParsedIngredient.objects.bulk_create([
+                ParsedIngredient(
+                    recipe_id=r['pk'], position=position, quantity=quantity,
+                    unit=unit, name=name, category=category
+                )
+                for r in reparsed
+                for position, quantity, unit, name, category in r['parsed']
+            ])
+
+        if changed:
+            # bulk_update skips post_save, so drop cached pages here
+            response_cache.invalidate_recipes([r['pk'] for r in changed])
+        self.changed += len(changed)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'Checked {self.checked}, re-converted {self.changed} '
+            f'({self.checked / elapsed if elapsed else 0:.0f}/s)'
+        )
+        if self.throttle:
+            time.sleep(self.throttle)
@@ -0,0 +1,93 @@
+import fnmatch
+import json
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.benchmarks.macro import benchmark_environment, macro_benchmarks
+from recipes.benchmarks.micro import micro_benchmarks
+from recipes.benchmarks.runner import (
+    Benchmark, compare, environment, format_seconds, run_benchmarks
+)
+
+
+class Command(BaseCommand):
+    help = 'Runs the micro and macro benchmark suites, optionally comparing against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suite', choices=['micro', 'macro', 'all'], default='all')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed samples per benchmark')
+        parser.add_argument('--seed', type=int, default=1234, help='Seed for the generated recipes')
+        parser.add_argument('--filter', help='Only run benchmarks matching this glob, e.g. "api.*"')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', metavar='BASELINE', help='JSON file from an earlier --output run')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.10,
+            help='Fail when a median is this much slower than the baseline (0.10 = 10%%)'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)['benchmarks']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {e}")
+
+        results = {}
+        if options['suite'] in ('micro', 'all'):
+            results.update(self.run_suite(micro_benchmarks(options['seed']), options))
+        if options['suite'] in ('macro', 'all'):
+            with benchmark_environment():
+                results.update(self.run_suite(macro_benchmarks(options['seed']), options))
+
+        if not results:
+            raise CommandError('No benchmarks matched')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'environment': environment(),
+                    'seed': options['seed'],
+                    'benchmarks': results,
+                }, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            self.report_comparison(compare(baseline, results, options['threshold']))
+
+    def run_suite(self, benchmarks: List[Benchmark], options) -> Dict[str, Dict[str, Any]]:
+        if options['filter']:
+            benchmarks = [b for b in benchmarks if fnmatch.fnmatch(b.name, options['filter'])]
+        return run_benchmarks(benchmarks, options['repeat'], report=self.report)
+
+    def report(self, name: str, result: Dict[str, Any]) -> None:
+        self.stdout.write(
+            f"{name:<40} {format_seconds(result['median']):>10} "
+            f"(min {format_seconds(result['min'])}, max {format_seconds(result['max'])})"
+        )
+
+    def report_comparison(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            self.stdout.write(self.style.WARNING('No benchmarks in common with the baseline'))
+            return
+        self.stdout.write('')
+        regressed = []
+        for row in rows:
+            line = (
+                f"{row['name']:<40} {format_seconds(row['baseline']):>10} -> "
+                f"{format_seconds(row['current']):>10} {row['change']:+.1%}"
+            )
+            if row['regressed']:
+                regressed.append(row['name'])
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressed:
+            raise CommandError(f"{len(regressed)} benchmark(s) regressed: {', '.join(regressed)}")
+        self.stdout.write(self.style.SUCCESS('No regressions'))
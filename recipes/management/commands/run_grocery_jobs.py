@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from recipes.models import GroceryListJob
+
+class Command(BaseCommand):
+    help = 'Runs queued grocery list generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the queue is empty'
+        )
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=300,
+            help='Seconds before a running job is considered abandoned'
+        )
+        parser.add_argument('--max-jobs', type=int, default=None)
+
+    def handle(self, *args, **options):
+        lease = timedelta(seconds=options['lease'])
+        max_jobs = options['max_jobs']
+        processed = 0
+        try:
+            while max_jobs is None or processed < max_jobs:
+                job = GroceryListJob.claim_next(lease)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                processed += 1
+                if job.run():
+                    self.stdout.write(f'Job {job.pk}: built list {job.grocery_list_id}')
+                else:
+                    self.stdout.write(self.style.ERROR(
+                        f'Job {job.pk}: attempt {job.attempts} failed'
+                    ))
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
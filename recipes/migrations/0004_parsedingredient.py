@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 05:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_grocerylist_groceryitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParsedIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('quantity', models.FloatField(blank=True, null=True)),
+                ('unit', models.CharField(blank=True, max_length=50, null=True)),
+                ('name', models.CharField(max_length=255)),
+                ('category', models.CharField(choices=[('produce', 'Produce'), ('dairy', 'Dairy'), ('meat', 'Meat'), ('pantry', 'Pantry'), ('frozen', 'Frozen'), ('beverages', 'Beverages'), ('other', 'Other')], default='other', max_length=20)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parsed_ingredients', to='recipes.recipe')),
+            ],
+            options={
+                'verbose_name': 'Parsed Ingredient',
+                'verbose_name_plural': 'Parsed Ingredients',
+                'ordering': ['recipe', 'position'],
+                'unique_together': {('recipe', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 05:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_parsedingredient'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groceryitem',
+            index=models.Index(fields=['grocery_list', 'category', 'ingredient'], include=('quantity', 'unit', 'checked', 'custom', 'created_at', 'updated_at'), name='groceryitem_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grocerylist',
+            index=models.Index(fields=['user', '-updated_at'], name='grocerylist_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'created_at'], name='recipe_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-created_at', '-id'], name='recipe_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedrecipe',
+            index=models.Index(fields=['user', '-updated_at'], name='savedrecipe_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from recipes.search import install_search_index
+    install_search_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    from recipes.search import uninstall_search_index
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
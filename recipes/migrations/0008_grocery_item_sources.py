@@ -0,0 +1,88 @@
+# Generated by Django 5.2 on 2026-10-18 05:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_item_sources(apps, schema_editor):
+    """
+    Give existing recipe items a base-unit total and attribute them to the
+    recipes that fed them, so recipes can be removed from older lists too.
+    """
+    from recipes.utils.ingredient_parser import (
+        SimilarIngredientIndex, convert_fraction_to_float, normalize_unit, unit_family
+    )
+
+    GroceryList = apps.get_model('recipes', 'GroceryList')
+    GroceryItem = apps.get_model('recipes', 'GroceryItem')
+    GroceryItemSource = apps.get_model('recipes', 'GroceryItemSource')
+    ParsedIngredient = apps.get_model('recipes', 'ParsedIngredient')
+
+    for grocery_list in GroceryList.objects.filter(items__custom=False).distinct().iterator():
+        items = list(GroceryItem.objects.filter(
+            grocery_list=grocery_list, custom=False
+        ).order_by('pk'))
+        index = SimilarIngredientIndex()
+        for position, item in enumerate(items):
+            item.base_unit = unit_family(item.unit)
+            if item.quantity and item.unit:
+                item.base_quantity = normalize_unit(
+                    convert_fraction_to_float(item.quantity), item.unit
+                )[0]
+            index.add(position, item.ingredient.lower())
+        GroceryItem.objects.bulk_update(items, ['base_unit', 'base_quantity'])
+
+        contributions = {}
+        rows = ParsedIngredient.objects.filter(
+            recipe__grocerylist=grocery_list
+        ).order_by('recipe_id', 'position')
+        for row in rows:
+            family = unit_family(row.unit)
+            position = index.find(
+                row.name.lower(),
+                lambda key: items[key].base_unit == family
+            )
+            if position is None:
+                continue
+            amount = normalize_unit(row.quantity, row.unit)[0] if row.quantity and family else 0.0
+            key = (items[position].pk, row.recipe_id)
+            contributions[key] = contributions.get(key, 0.0) + amount
+        GroceryItemSource.objects.bulk_create([
+            GroceryItemSource(item_id=item_id, recipe_id=recipe_id, base_quantity=amount)
+            for (item_id, recipe_id), amount in contributions.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_grocerylist_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groceryitem',
+            name='base_quantity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='groceryitem',
+            name='base_unit',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.CreateModel(
+            name='GroceryItemSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_quantity', models.FloatField(default=0.0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='recipes.groceryitem')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grocery_item_sources', to='recipes.recipe')),
+            ],
+            options={
+                'verbose_name': 'Grocery Item Source',
+                'verbose_name_plural': 'Grocery Item Sources',
+                'unique_together': {('item', 'recipe')},
+            },
+        ),
+        migrations.RunPython(backfill_item_sources, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_grocery_item_sources'),
+    ]
+
+    operations = [
+        # Nullable so SQLite adds the column in place; remaking recipes_recipe
+        # would drop the full-text search triggers (see recipes.search).
+        migrations.AddField(
+            model_name='recipe',
+            name='conversion_version',
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_import_progress'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='groceryitem',
+            name='groceryitem_list_order_idx',
+        ),
+        migrations.AddIndex(
+            model_name='groceryitem',
+            index=models.Index(fields=['grocery_list', 'category', 'ingredient'], include=('id', 'quantity', 'unit', 'checked', 'custom', 'created_at', 'updated_at'), name='groceryitem_list_order_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.conf import settings
-from typing import Optional, Dict, Any, List
+from django.utils import timezone
+from healthy_recipe_converter.profiling import span
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
 class Recipe(models.Model):
     user: Optional[settings.AUTH_USER_MODEL] = models.ForeignKey(
@@ -11,9 +15,20 @@ class Recipe(models.Model):
     instructions: str = models.TextField()
     converted_ingredients: str = models.TextField(blank=True)
     converted_instructions: str = models.TextField(blank=True)
+    # SubstitutionEngine.version of the rules that produced the converted
+    # fields; NULL when unknown. See the reconvert_recipes command.
+    conversion_version: Optional[str] = models.CharField(max_length=16, null=True, blank=True)
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # A user's recipes by creation date
+            models.Index(fields=['user', 'created_at'], name='recipe_user_created_idx'),
+            # Cursor pagination of the public recipe list
+            models.Index(fields=['-created_at', '-id'], name='recipe_created_id_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
@@ -32,6 +47,9 @@ class SavedRecipe(models.Model):
     class Meta:
         ordering = ['-updated_at']
         unique_together = ['user', 'recipe']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='savedrecipe_user_updated_idx'),
+        ]
         verbose_name = 'Saved Recipe'
         verbose_name_plural = 'Saved Recipes'
 
@@ -48,6 +66,11 @@ class GroceryList(models.Model):
         ('beverages', 'Beverages'),
         ('other', 'Other'),
     ]
+    STATUS_CHOICES = [
+        ('ready', 'Ready'),
+        ('building', 'Building'),
+        ('failed', 'Failed'),
+    ]
 
     user: settings.AUTH_USER_MODEL = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -55,17 +78,174 @@ class GroceryList(models.Model):
     )
     name: str = models.CharField(max_length=255)
     recipes: List[Recipe] = models.ManyToManyField(Recipe, blank=True)
+    # 'building' while a GroceryListJob is generating the items
+    status: str = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ready')
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='grocerylist_user_updated_idx'),
+        ]
         verbose_name = 'Grocery List'
         verbose_name_plural = 'Grocery Lists'
 
     def __str__(self) -> str:
         return f"{self.user.username}'s list: {self.name}"
 
+    def _merge_rows(
+        self, items: List['GroceryItem'], rows: Iterable['ParsedIngredient']
+    ) -> Dict[Tuple[int, int], float]:
+        """
+        Fold parsed ingredient rows into `items` the way combineIngredients
+        does: a row joins the first similar item in its unit family, or starts
+        a new unsaved item appended to `items`. Returns each
+        (item position, recipe id) pair's contribution in base units.
+        """
+        from .utils.ingredient_parser import SimilarIngredientIndex, normalize_unit, unit_family
+
+        index = SimilarIngredientIndex()
+        for position, item in enumerate(items):
+            index.add(position, item.ingredient.lower())
+
+        contributions: Dict[Tuple[int, int], float] = {}
+        for row in rows:
+            family = unit_family(row.unit)
+            position = index.find(
+                row.name.lower(),
+                lambda key: items[key].base_unit == family
+            )
+            if position is None:
+                position = len(items)
+                items.append(GroceryItem(
+                    grocery_list=self,
+                    ingredient=row.name,
+                    unit=row.unit,
+                    base_unit=family,
+                    category=row.category
+                ))
+                index.add(position, row.name.lower())
+
+            amount = 0.0
+            if row.quantity and family:
+                amount = normalize_unit(row.quantity, row.unit)[0]
+                item = items[position]
+                item.base_quantity = (item.base_quantity or 0.0) + amount
+            key = (position, row.recipe_id)
+            contributions[key] = contributions.get(key, 0.0) + amount
+        return contributions
+
+    def _apply_rows(self, items: List['GroceryItem'], rows: Iterable['ParsedIngredient']) -> None:
+        """Merge `rows` into the saved `items` and write only what changed."""
+        existing = len(items)
+        rows = list(rows)  # fetch before timing the merge
+        with span('combine'):
+            contributions = self._merge_rows(items, rows)
+        touched = sorted({position for position, _ in contributions})
+        now = timezone.now()
+        for position in touched:
+            items[position].refresh_display()
+            items[position].updated_at = now
+
+        GroceryItem.objects.bulk_create([items[p] for p in touched if p >= existing])
+        changed = [items[p] for p in touched if p < existing]
+        if changed:
+            GroceryItem.objects.bulk_update(
+                changed, ['quantity', 'unit', 'base_quantity', 'updated_at']
+            )
+        GroceryItemSource.objects.bulk_create([
+            GroceryItemSource(item=items[position], recipe_id=recipe_id, base_quantity=amount)
+            for (position, recipe_id), amount in contributions.items()
+        ])
+
+    def touch(self, **fields: Any) -> None:
+        """Bump updated_at (and set `fields`) without loading the list."""
+        GroceryList.objects.filter(pk=self.pk).update(updated_at=timezone.now(), **fields)
+
+    def generate_items(self) -> None:
+        """
+        Replace the list's recipe-derived items and mark it ready. Safe to run
+        more than once: manually added items are kept, the rest are rebuilt.
+        """
+        # Ingredients are parsed when recipes are saved, so one query
+        # fetches every line of every recipe on the list
+        rows = ParsedIngredient.objects.filter(
+            recipe__grocerylist=self
+        ).order_by('recipe_id', 'position').only(
+            'recipe_id', 'quantity', 'unit', 'name', 'category'
+        )
+        with transaction.atomic():
+            self.items.filter(custom=False).delete()
+            self._apply_rows([], rows)
+            self.touch(status='ready')
+        self.status = 'ready'
+
+    def lock(self) -> None:
+        """Lock the list's row until the current transaction ends.
+
+        add_recipe and remove_recipe take it before checking membership, so
+        concurrent edits of one list run one after the other.
+        """
+        GroceryList.objects.select_for_update().only('pk').get(pk=self.pk)
+
+    def add_recipe(self, recipe: Recipe) -> bool:
+        """
+        Add a recipe and fold its ingredients into the existing items, keeping
+        their checked state. Only the recipe's own rows are read and only the
+        items they touch are written. Returns False if it was already on the list.
+        """
+        with transaction.atomic():
+            self.lock()
+            if self.recipes.filter(pk=recipe.pk).exists():
+                return False
+            self.recipes.add(recipe)
+            items = list(
+                self.items.filter(custom=False).select_for_update().order_by('pk')
+            )
+            self._apply_rows(items, recipe.parsed_ingredients.all())
+            self.touch()
+        return True
+
+    def remove_recipe(self, recipe: Recipe) -> bool:
+        """
+        Remove a recipe and subtract its contribution from the items it fed.
+        Items no other recipe contributes to are deleted; custom items are
+        never touched. Returns False if the recipe was not on the list.
+        """
+        with transaction.atomic():
+            self.lock()
+            if not self.recipes.filter(pk=recipe.pk).exists():
+                return False
+            self.recipes.remove(recipe)
+            sources = list(GroceryItemSource.objects.filter(
+                item__grocery_list=self, recipe=recipe
+            ).select_related('item').select_for_update())
+            GroceryItemSource.objects.filter(pk__in=[source.pk for source in sources]).delete()
+
+            items = {source.item_id: source.item for source in sources}
+            for source in sources:
+                item = items[source.item_id]
+                if source.base_quantity and item.base_quantity is not None:
+                    item.base_quantity -= source.base_quantity
+
+            still_sourced = set(GroceryItemSource.objects.filter(
+                item_id__in=items
+            ).values_list('item_id', flat=True))
+            GroceryItem.objects.filter(pk__in=set(items) - still_sourced).delete()
+
+            now = timezone.now()
+            remaining = [items[pk] for pk in still_sourced]
+            for item in remaining:
+                item.refresh_display()
+                item.updated_at = now
+            if remaining:
+                GroceryItem.objects.bulk_update(
+                    remaining, ['quantity', 'unit', 'base_quantity', 'updated_at']
+                )
+            self.touch()
+        return True
+
 class GroceryItem(models.Model):
     grocery_list: GroceryList = models.ForeignKey(
         GroceryList,
@@ -82,11 +262,27 @@ class GroceryItem(models.Model):
     )
     checked: bool = models.BooleanField(default=False)
     custom: bool = models.BooleanField(default=False)  # True for manually added items
+    # Running total in the unit family's base unit, so recipes can be added
+    # and removed without re-deriving the rounded display quantity
+    base_quantity: Optional[float] = models.FloatField(null=True, blank=True)
+    base_unit: Optional[str] = models.CharField(max_length=50, null=True, blank=True)
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['category', 'ingredient']
+        indexes = [
+            # Items of a list in display order. On PostgreSQL the remaining
+            # serialized columns (see grocery_list_queryset) are included so
+            # the read is index-only.
+            models.Index(
+                fields=['grocery_list', 'category', 'ingredient'],
+                name='groceryitem_list_order_idx',
+                include=[
+                    'id', 'quantity', 'unit', 'checked', 'custom', 'created_at', 'updated_at'
+                ]
+            ),
+        ]
         verbose_name = 'Grocery Item'
         verbose_name_plural = 'Grocery Items'
 
@@ -98,3 +294,268 @@ class GroceryItem(models.Model):
             parts.append(self.unit)
         parts.append(self.ingredient)
         return ' '.join(parts)
+
+    def refresh_display(self) -> None:
+        """Set quantity and unit from base_quantity, picking a readable unit."""
+        from .utils.ingredient_parser import display_quantity
+
+        if self.base_quantity is None or not self.base_unit:
+            return
+        total, unit = display_quantity(max(self.base_quantity, 0.0), self.base_unit)
+        self.quantity = str(total) if total > 0 else None
+        self.unit = unit
+
+    def rebase_quantity(self) -> None:
+        """Reset base_quantity and base_unit from an edited quantity and unit."""
+        from .utils.ingredient_parser import convert_fraction_to_float, normalize_unit, unit_family
+
+        self.base_unit = unit_family(self.unit)
+        self.base_quantity = None
+        if self.quantity and self.unit:
+            self.base_quantity = normalize_unit(
+                convert_fraction_to_float(self.quantity), self.unit
+            )[0]
+
+class GroceryItemSource(models.Model):
+    """How much one recipe contributed to a combined grocery item."""
+    item: GroceryItem = models.ForeignKey(
+        GroceryItem,
+        on_delete=models.CASCADE,
+        related_name='sources'
+    )
+    recipe: Recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='grocery_item_sources'
+    )
+    base_quantity: float = models.FloatField(default=0.0)
+
+    class Meta:
+        unique_together = ['item', 'recipe']
+        verbose_name = 'Grocery Item Source'
+        verbose_name_plural = 'Grocery Item Sources'
+
+    def __str__(self) -> str:
+        return f"{self.recipe_id} -> {self.item_id}: {self.base_quantity:g}"
+
+class ParsedIngredient(models.Model):
+    """One parsed line of a recipe's converted ingredients."""
+    recipe: Recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='parsed_ingredients'
+    )
+    position: int = models.PositiveIntegerField()  # Line order within the recipe
+    quantity: Optional[float] = models.FloatField(null=True, blank=True)
+    unit: Optional[str] = models.CharField(max_length=50, null=True, blank=True)
+    name: str = models.CharField(max_length=255)
+    category: str = models.CharField(
+        max_length=20,
+        choices=GroceryList.CATEGORY_CHOICES,
+        default='other'
+    )
+
+    class Meta:
+        ordering = ['recipe', 'position']
+        unique_together = ['recipe', 'position']
+        verbose_name = 'Parsed Ingredient'
+        verbose_name_plural = 'Parsed Ingredients'
+
+    def __str__(self) -> str:
+        parts = []
+        if self.quantity is not None:
+            parts.append(f'{self.quantity:g}')
+        if self.unit:
+            parts.append(self.unit)
+        parts.append(self.name)
+        return ' '.join(parts)
+
+    @classmethod
+    def build_for_recipe(cls, recipe: Recipe) -> List['ParsedIngredient']:
+        """Parse a recipe's converted ingredients into unsaved rows."""
+        from .utils.ingredient_parser import parse_ingredients, categorizeIngredient
+
+        lines = [line for line in recipe.converted_ingredients.split('\n') if line.strip()]
+        rows = []
+        with span('parse'):
+            for quantity, unit, name in parse_ingredients(lines):
+                if not name:
+                    continue
+                rows.append(cls(
+                    recipe=recipe,
+                    position=len(rows),
+                    quantity=quantity,
+                    unit=unit,
+                    name=name[:255],
+                    category=categorizeIngredient(name)
+                ))
+        return rows
+
+    @classmethod
+    def rebuild_for_recipe(cls, recipe: Recipe) -> None:
+        """Replace a recipe's parsed rows with freshly parsed ones."""
+        cls.objects.filter(recipe=recipe).delete()
+        cls.objects.bulk_create(cls.build_for_recipe(recipe))
+
+class GroceryListJob(models.Model):
+    """
+    A queued request to generate a grocery list's items, run by the
+    `run_grocery_jobs` worker. Workers claim a job with a conditional UPDATE,
+    so several can poll the same table without double-processing.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('pending', 'running')
+
+    grocery_list: GroceryList = models.ForeignKey(
+        GroceryList,
+        on_delete=models.CASCADE,
+        related_name='jobs'
+    )
+    status: str = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts: int = models.PositiveIntegerField(default=0)
+    max_attempts: int = models.PositiveIntegerField(default=3)
+    last_error: str = models.TextField(blank=True)
+    # Pending jobs wait until run_after; running jobs whose lease has expired
+    # are assumed abandoned by a dead worker and may be claimed again.
+    run_after: models.DateTimeField = models.DateTimeField(default=timezone.now)
+    lease_expires_at: Optional[models.DateTimeField] = models.DateTimeField(null=True, blank=True)
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            # At most one queued or running job per list
+            models.UniqueConstraint(
+                fields=['grocery_list'],
+                condition=Q(status__in=['pending', 'running']),
+                name='grocerylistjob_one_active_per_list'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='grocerylistjob_queue_idx'),
+        ]
+        verbose_name = 'Grocery List Job'
+        verbose_name_plural = 'Grocery List Jobs'
+
+    def __str__(self) -> str:
+        return f"Job {self.pk} for list {self.grocery_list_id}: {self.status}"
+
+    @classmethod
+    def enqueue(cls, grocery_list: GroceryList) -> 'GroceryListJob':
+        """Queue generation for a list, reusing its active job if it has one."""
+        with transaction.atomic():
+            grocery_list.touch(status='building')
+            grocery_list.status = 'building'
+            job = cls.objects.filter(
+                grocery_list=grocery_list, status__in=cls.ACTIVE_STATUSES
+            ).first()
+            if job is None:
+                job = cls.objects.create(grocery_list=grocery_list)
+        return job
+
+    @classmethod
+    def claim_next(cls, lease: timedelta) -> Optional['GroceryListJob']:
+        """
+        Claim the oldest runnable job for this worker, or return None if there
+        is nothing to do. The claim bumps `attempts`, which also serves as the
+        token checked when the job is finished. An abandoned job that has
+        used up its attempts (its worker keeps dying) is marked failed instead.
+        """
+        while True:
+            now = timezone.now()
+            candidate = cls.objects.filter(
+                Q(status='pending', run_after__lte=now)
+                | Q(status='running', lease_expires_at__lt=now)
+            ).order_by('run_after', 'pk').values(
+                'pk', 'grocery_list_id', 'status', 'attempts', 'max_attempts'
+            ).first()
+            if candidate is None:
+                return None
+            current = cls.objects.filter(
+                pk=candidate['pk'],
+                status=candidate['status'],
+                attempts=candidate['attempts']
+            )
+            if candidate['status'] == 'running' and candidate['attempts'] >= candidate['max_attempts']:
+                if current.update(
+                    status='failed',
+                    last_error='Worker lease expired on the final attempt',
+                    lease_expires_at=None,
+                    updated_at=now
+                ):
+                    GroceryList(pk=candidate['grocery_list_id']).touch(status='failed')
+                continue
+            claimed = current.update(
+                status='running',
+                attempts=F('attempts') + 1,
+                lease_expires_at=now + lease,
+                updated_at=now
+            )
+            if claimed:
+                return cls.objects.select_related('grocery_list').get(pk=candidate['pk'])
+            # Another worker took it first; look for the next one
+
+    def _finish(self, **fields: Any) -> bool:
+        """Record the outcome if this worker still holds the claim."""
+        fields.setdefault('updated_at', timezone.now())
+        return bool(type(self).objects.filter(
+            pk=self.pk, status='running', attempts=self.attempts
+        ).update(lease_expires_at=None, **fields))
+
+    def _hold_claim(self) -> bool:
+        """
+        Lock the job row if this worker still holds the claim. Inside a
+        transaction, a worker that reclaims the job after the lease expires
+        then waits for this one to finish instead of rebuilding alongside it.
+        """
+        return type(self).objects.select_for_update().filter(
+            pk=self.pk, status='running', attempts=self.attempts
+        ).exists()
+
+    def run(self) -> bool:
+        """
+        Generate the list's items. Failures are retried with backoff until
+        max_attempts is reached, after which the list is marked failed.
+        Returns True if the job completed. A worker whose claim was taken
+        over after its lease expired writes nothing and returns False.
+        """
+        try:
+            with transaction.atomic():
+                if not self._hold_claim():
+                    return False
+                self.grocery_list.generate_items()
+                self._finish(status='done', last_error='')
+        except Exception as exc:
+            if self.attempts < self.max_attempts:
+                self._finish(
+                    status='pending',
+                    last_error=repr(exc),
+                    run_after=timezone.now() + timedelta(seconds=2 ** self.attempts)
+                )
+            elif self._finish(status='failed', last_error=repr(exc)):
+                GroceryList(pk=self.grocery_list_id).touch(status='failed')
+            return False
+        return True
+
+class ImportProgress(models.Model):
+    """
+    How many input records of a named `import_recipes` run are committed.
+    Updated in the same transaction as each batch, so a resumed import
+    neither skips nor repeats records.
+    """
+    name: str = models.CharField(max_length=255, unique=True)
+    records: int = models.PositiveIntegerField(default=0)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Import Progress'
+        verbose_name_plural = 'Import Progress'
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.records} records"
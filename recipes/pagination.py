@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over recipes, newest first.
+
+    The cursor encodes a position in the (created_at, id) ordering, so each
+    page is a single indexed range query no matter how deep the client pages.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
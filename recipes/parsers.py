@@ -0,0 +1,35 @@
+import json
+from typing import Any, Iterator
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON lazily, one object per non-blank line.
+
+    Returns a generator so large uploads can be consumed while the response is
+    being streamed. A line that is not valid JSON, or not valid text in the
+    body's encoding, yields a `ParseError` instance in its place instead of
+    aborting the whole body.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None) -> Iterator[Any]:
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if stream is None:
+            return iter(())
+        return self._iter_lines(stream, encoding)
+
+    def _iter_lines(self, stream, encoding: str) -> Iterator[Any]:
+        for raw in iter(stream.readline, b''):
+            try:
+                line = raw.decode(encoding).strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+            except ValueError as exc:  # Also catches UnicodeDecodeError
+                yield ParseError(f'NDJSON parse error - {exc}')
+                continue
+            yield record
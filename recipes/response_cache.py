@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+
+class ResponseCache:
+    """
+    Shared cache of rendered public recipe responses.
+
+    Detail page keys include a per-recipe version, bumped when that recipe
+    is saved or deleted. List and search pages can contain any recipe, so
+    their keys include a generation number that every recipe change bumps.
+    Pages stored under an old version or generation are never read again and
+    expire on their own, so a request that rendered the old row and stores
+    it after the bump can't serve it to anyone.
+    """
+
+    def __init__(self, cache_alias: str = 'default', timeout: Optional[int] = None,
+                 prefix: str = 'recipe-response'):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def detail_key(self, pk: Any) -> str:
+        version = self._counter(f'{self.prefix}:detail-version:{pk}')
+        return f'{self.prefix}:detail:{pk}:{version}'
+
+    def page_key(self, path: str) -> str:
+        """Key for a list page, `path` including its query string."""
+        digest = hashlib.sha256(path.encode('utf-8')).hexdigest()
+        return f'{self.prefix}:page:{self.generation()}:{digest}'
+
+    def generation(self) -> int:
+        return self._counter(f'{self.prefix}:generation')
+
+    def _counter(self, key: str) -> int:
+        value = self.cache.get(key)
+        if value is None:
+            # Seed from the clock so a counter evicted from the cache
+            # can't come back and revive pages cached under it
+            self.cache.add(key, time.time_ns(), None)
+            value = self.cache.get(key)
+        return value
+
+    def _bump(self, key: str) -> None:
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), None)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        self.cache.set(key, entry, self.timeout)
+
+    def store(self, key: str, response: HttpResponse) -> None:
+        """Cache a rendered 200 response with its validators."""
+        if response.status_code != 200:
+            return
+        self.set(key, {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': response.get('ETag'),
+            'last_modified': response.get('Last-Modified'),
+        })
+
+    def invalidate_recipe(self, pk: Any) -> None:
+        """Drop a recipe's detail page and every list page."""
+        self._bump(f'{self.prefix}:detail-version:{pk}')
+        self.invalidate_pages()
+
+    def invalidate_recipes(self, pks: Iterable[Any]) -> None:
+        """Like invalidate_recipe for many recipes, e.g. after a bulk_update."""
+        for pk in pks:
+            self._bump(f'{self.prefix}:detail-version:{pk}')
+        self.invalidate_pages()
+
+    def invalidate_pages(self) -> None:
+        """Drop every list and search page, e.g. after a bulk insert."""
+        self._bump(f'{self.prefix}:generation')
+
+    def clear_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+response_cache = ResponseCache(
+    cache_alias=settings.RECIPE_RESPONSE_CACHE['CACHE_ALIAS'],
+    timeout=settings.RECIPE_RESPONSE_CACHE['TIMEOUT'],
+)
+
+
+def cached_response(request: Any, entry: Dict[str, Any]) -> HttpResponse:
+    """The response for a cache hit: the stored page, or a 304 if it still matches."""
+    last_modified = parse_http_date_safe(entry['last_modified'] or '')
+    response = get_conditional_response(
+        request, etag=entry['etag'], last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    for header, name in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+        if entry[name]:
+            response[header] = entry[name]
+    response['X-Response-Cache'] = 'hit'
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serves GETs of a view from `response_cache`, without touching the
+    database or the serializer on a hit.
+
+    Views override `get_response_cache_key()`. Only JSON responses with
+    status 200 are stored. Hits still answer If-None-Match and
+    If-Modified-Since from the stored validators. Every response carries an
+    `X-Response-Cache` header of "hit" or "miss".
+    """
+    response_cache_key = None
+
+    def get_response_cache_key(self) -> Optional[str]:
+        """None (the default) leaves the response uncached."""
+        return None
+
+    def get(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        if request.accepted_renderer.format != 'json':
+            return super().get(request, *args, **kwargs)
+        key = self.get_response_cache_key()
+        if key is None:
+            return super().get(request, *args, **kwargs)
+        entry = response_cache.get(key)
+        if entry is None:
+            self.response_cache_key = key
+            return super().get(request, *args, **kwargs)
+        return cached_response(request, entry)
+
+    def finalize_response(self, request: Any, response: Any, *args: Any, **kwargs: Any) -> Any:
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.response_cache_key is None:
+            return response
+        if isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            response_cache.store(self.response_cache_key, response)
+        response['X-Response-Cache'] = 'miss'
+        return response
@@ -0,0 +1,124 @@
+"""
+Full-text search over recipe titles and ingredients.
+
+On SQLite the index is an external-content FTS5 table kept in sync by
+triggers; on PostgreSQL it is a stored generated `tsvector` column with a GIN
+index. Both are maintained by the database itself, so every write path
+(including bulk_create and bulk_update) keeps the index current. Other
+backends fall back to `icontains` filtering.
+
+SQLite drops a table's triggers when Django rebuilds it (for example when a
+migration adds a NOT NULL column to recipes_recipe); such migrations must
+call `install_search_index` again.
+"""
+import re
+from typing import List
+from django.db import connection
+from django.db.models import Q
+from .models import Recipe
+
+SEARCH_FIELDS = ['title', 'ingredients', 'converted_ingredients']
+
+# Words that carry no meaning in a search like "butter and sugar"
+STOP_WORDS = {'a', 'an', 'and', 'of', 'the', 'with'}
+
+SQLITE_INSTALL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5(
+        title, ingredients, converted_ingredients,
+        content='recipes_recipe', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_insert
+    AFTER INSERT ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(rowid, title, ingredients, converted_ingredients)
+        VALUES (new.id, new.title, new.ingredients, new.converted_ingredients);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_delete
+    AFTER DELETE ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, title, ingredients, converted_ingredients)
+        VALUES ('delete', old.id, old.title, old.ingredients, old.converted_ingredients);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_update
+    AFTER UPDATE OF title, ingredients, converted_ingredients ON recipes_recipe BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, title, ingredients, converted_ingredients)
+        VALUES ('delete', old.id, old.title, old.ingredients, old.converted_ingredients);
+        INSERT INTO recipes_recipe_fts(rowid, title, ingredients, converted_ingredients)
+        VALUES (new.id, new.title, new.ingredients, new.converted_ingredients);
+    END""",
+    "INSERT INTO recipes_recipe_fts(recipes_recipe_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS recipes_recipe_fts_insert",
+    "DROP TRIGGER IF EXISTS recipes_recipe_fts_delete",
+    "DROP TRIGGER IF EXISTS recipes_recipe_fts_update",
+    "DROP TABLE IF EXISTS recipes_recipe_fts",
+]
+
+POSTGRESQL_INSTALL = [
+    """ALTER TABLE recipes_recipe ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(ingredients, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(converted_ingredients, '')), 'B')
+    ) STORED""",
+    """CREATE INDEX IF NOT EXISTS recipes_recipe_search_idx
+    ON recipes_recipe USING GIN (search_vector)""",
+]
+
+POSTGRESQL_UNINSTALL = [
+    "DROP INDEX IF EXISTS recipes_recipe_search_idx",
+    "ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector",
+]
+
+def install_search_index(schema_editor) -> None:
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRESQL_INSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+def uninstall_search_index(schema_editor) -> None:
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRESQL_UNINSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+def search_terms(query: str) -> List[str]:
+    return [
+        term for term in re.findall(r'\w+', query.lower())
+        if term not in STOP_WORDS
+    ]
+
+def search_recipe_ids(query: str, limit: int) -> List[int]:
+    """Return ids of recipes matching every term of `query`, best match first."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        # Title matches weigh twice as much as ingredient matches
+        sql = (
+            "SELECT rowid FROM recipes_recipe_fts WHERE recipes_recipe_fts MATCH %s "
+            "ORDER BY bm25(recipes_recipe_fts, 10.0, 5.0, 5.0) LIMIT %s"
+        )
+        params = [' '.join(f'"{term}"' for term in terms), limit]
+    elif connection.vendor == 'postgresql':
+        sql = (
+            "SELECT id FROM recipes_recipe, plainto_tsquery('english', %s) query "
+            "WHERE search_vector @@ query "
+            "ORDER BY ts_rank(search_vector, query) DESC LIMIT %s"
+        )
+        params = [' '.join(terms), limit]
+    else:
+        recipes = Recipe.objects.all()
+        for term in terms:
+            recipes = recipes.filter(
+                Q(title__icontains=term) |
+                Q(ingredients__icontains=term) |
+                Q(converted_ingredients__icontains=term)
+            )
+        return list(recipes.order_by('-created_at').values_list('id', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Recipe, SavedRecipe, GroceryList, GroceryItem
+from .models import Recipe, SavedRecipe, GroceryList, GroceryItem, GroceryListJob
 from users.serializers import UserSerializer
+from typing import List
 
 class RecipeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,6 +18,39 @@ class RecipeSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+class SparseFieldsetMixin:
+    """
+    Limits output to the fields named in the comma-separated `fields` query
+    parameter. Without it, `default_fields` are returned (all fields if unset).
+    """
+    default_fields = None
+
+    @classmethod
+    def requested_fields(cls, request) -> List[str]:
+        available = cls.Meta.fields
+        requested = request.query_params.get('fields') if request is not None else None
+        if requested:
+            names = [name.strip() for name in requested.split(',')]
+            fields = [name for name in available if name in names]
+            if fields:
+                return fields
+        return list(cls.default_fields or available)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(self.requested_fields(self.context.get('request')))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+class RecipeListSerializer(SparseFieldsetMixin, RecipeSerializer):
+    """Compact recipe representation for list pages; the large text columns
+    are only included when asked for with `?fields=`."""
+    default_fields = ['id', 'user', 'title', 'created_at', 'updated_at']
+
+    class Meta(RecipeSerializer.Meta):
+        pass
+
 class SavedRecipeSerializer(serializers.ModelSerializer):
     recipe = RecipeSerializer(read_only=True)
     user = UserSerializer(read_only=True)
@@ -54,12 +88,27 @@ class GroceryListSerializer(serializers.ModelSerializer):
             'id',
             'user',
             'name',
+            'status',
             'recipes',
             'items',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'status']
+
+class GroceryListJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GroceryListJob
+        fields = [
+            'id',
+            'grocery_list',
+            'status',
+            'attempts',
+            'last_error',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = fields
 
 class GroceryListCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a grocery list with recipe IDs"""
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Recipe, ParsedIngredient
+from .response_cache import response_cache
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_parsed_ingredients(sender, instance: Recipe, created: bool,
+                               update_fields=None, raw: bool = False, **kwargs) -> None:
+    """Keep ParsedIngredient rows in step with a recipe's converted ingredients."""
+    if raw:
+        return
+    if update_fields is not None and 'converted_ingredients' not in update_fields:
+        return
+    with transaction.atomic():
+        ParsedIngredient.rebuild_for_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_responses(sender, instance: Recipe, **kwargs) -> None:
+    """Drop cached pages showing this recipe.
+
+    Done at once and again after commit, so a request that read the old row
+    before the commit can't leave a stale page behind.
+    """
+    pk = instance.pk
+    response_cache.invalidate_recipe(pk)
+    transaction.on_commit(lambda: response_cache.invalidate_recipe(pk))
@@ -1,3 +1,1203 @@
-from django.test import TestCase
+import cProfile
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from random import Random
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from healthy_recipe_converter.profiling import SlowestProfiles
+from users.tokens import tokens_for_user
+from .async_views import (
+    AsyncGroceryListDetailView, AsyncGroceryListView, AsyncRecipeConvertView,
+    AsyncRecipeDetailView, AsyncRecipeListView, AsyncSavedRecipeListView
+)
+from .benchmarks.data import RecipeGenerator
+from .benchmarks.runner import compare
+from .conditional import ConditionalGetMixin
+from .management.commands import reconvert_recipes
+from .models import (
+    Recipe, SavedRecipe, GroceryList, GroceryItem, GroceryListJob, ImportProgress,
+    ParsedIngredient
+)
+from .response_cache import CachedResponseMixin, response_cache
+from .utils import ingredient_parser
+from .utils.ingredient_parser import (
+    CategoryMatcher, SimilarIngredientIndex, categories, combineIngredients, normalize_unit,
+    parse_ingredients, parseIngredient, sum_quantities
+)
+from .utils.substitutions import SubstitutionEngine
+from .views import SUBSTITUTIONS, conversion_cache
 
-# Create your tests here.
+
+class QueryBudgetTests(TestCase):
+    """Each read endpoint runs a fixed number of queries however many rows it returns.
+
+    Budgets include the query that computes ETag validators.
+    """
+    ROW_COUNTS = [1, 10, 100]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_recipes(self, count):
+        start = Recipe.objects.count()
+        return [
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                ingredients='1 cup butter\n2 cups sugar',
+                instructions='Mix.',
+                converted_ingredients='1 cup olive oil\n2 cups stevia',
+                converted_instructions='Mix.'
+            ) for i in range(start, count)
+        ]
+
+    def assert_budget(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_recipe_list(self):
+        for count in self.ROW_COUNTS:
+            with self.subTest(rows=count):
+                self.create_recipes(count)
+                self.assert_budget(reverse('recipe-list-create'), 2)
+
+    def test_recipe_detail(self):
+        recipe, = self.create_recipes(1)
+        self.assert_budget(reverse('recipe-detail', args=[recipe.pk]), 2)
+
+    def test_saved_recipe_list(self):
+        for count in self.ROW_COUNTS:
+            with self.subTest(rows=count):
+                for recipe in self.create_recipes(count):
+                    SavedRecipe.objects.create(user=self.user, recipe=recipe)
+                response = self.assert_budget(reverse('saved-recipe-list'), 2)
+                self.assertEqual(len(response.data), count)
+
+    def test_grocery_list_list(self):
+        for count in self.ROW_COUNTS:
+            with self.subTest(rows=count):
+                for recipe in self.create_recipes(count):
+                    grocery_list = GroceryList.objects.create(user=self.user, name=recipe.title)
+                    grocery_list.recipes.add(recipe)
+                    GroceryItem.objects.create(grocery_list=grocery_list, ingredient='flour')
+                response = self.assert_budget(reverse('grocery-list'), 4)
+                self.assertEqual(len(response.data), count)
+
+    def test_grocery_list_detail(self):
+        grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        for count in self.ROW_COUNTS:
+            with self.subTest(rows=count):
+                grocery_list.recipes.add(*self.create_recipes(count))
+                GroceryItem.objects.bulk_create(
+                    GroceryItem(grocery_list=grocery_list, ingredient=f'item {i}')
+                    for i in range(grocery_list.items.count(), count)
+                )
+                response = self.assert_budget(
+                    reverse('grocery-list-detail', args=[grocery_list.pk]), 4
+                )
+                self.assertEqual(len(response.data['items']), count)
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged resources are answered with 304 after only the validator query,
+    or none at all when the response cache already has the page."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Soup', ingredients='1 onion', instructions='Boil.'
+        )
+        self.grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        self.grocery_list.recipes.add(self.recipe)
+        self.item = GroceryItem.objects.create(grocery_list=self.grocery_list, ingredient='onion')
+
+    def assert_not_modified(self, url, queries=1, **headers):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_recipe_detail(self):
+        url = reverse('recipe-detail', args=[self.recipe.pk])
+        response = self.client.get(url)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assert_not_modified(url, 0, if_none_match=response['ETag'])
+        self.assert_not_modified(url, 0, if_modified_since=response['Last-Modified'])
+
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+        response = self.client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 200)
+
+    def test_grocery_list_detail_tracks_items(self):
+        url = reverse('grocery-list-detail', args=[self.grocery_list.pk])
+        etag = self.client.get(url)['ETag']
+        self.assert_not_modified(url, if_none_match=etag)
+
+        response = self.client.patch(
+            reverse('grocery-item-update', args=[self.item.pk]), {'checked': True}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        response = self.client.delete(reverse('grocery-item-delete', args=[self.item.pk]))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_list_tracks_only_its_page(self):
+        older = self.recipe
+        newer = [
+            Recipe.objects.create(title=f'Recipe {i}', ingredients='1 egg', instructions='')
+            for i in range(2)
+        ]
+        url = reverse('recipe-list-create') + '?page_size=2'
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.assert_not_modified(url, if_none_match=etag)
+        self.assertIn('LIMIT 3', queries[0]['sql'])
+
+        # Off the page: only whether a next page exists matters
+        older.title = 'Stew'
+        older.save()
+        self.assert_not_modified(url, if_none_match=etag)
+
+        newer[0].title = 'Pie'
+        newer[0].save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        older.delete()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['next'])
+
+    def test_etag_varies_with_query_string(self):
+        url = reverse('recipe-list-create')
+        etag = self.client.get(url)['ETag']
+        self.assert_not_modified(url, 0, if_none_match=etag)
+        response = self.client.get(url + '?fields=title', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+    """Public recipe pages are served from cache until a recipe changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.recipe = Recipe.objects.create(
+            title='Soup', ingredients='1 onion', instructions='Boil.'
+        )
+
+    def get(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_detail_cached_until_saved(self):
+        url = reverse('recipe-detail', args=[self.recipe.pk])
+        self.assertEqual(self.get(url, 2)['X-Response-Cache'], 'miss')
+        response = self.get(url, 0)
+        self.assertEqual(response['X-Response-Cache'], 'hit')
+        self.assertEqual(response.json()['title'], 'Soup')
+
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+        self.assertEqual(self.get(url, 2).json()['title'], 'Stew')
+
+    def test_page_stored_after_invalidation_is_never_served(self):
+        url = reverse('recipe-detail', args=[self.recipe.pk])
+        # A slow reader picks its key, then the recipe changes under it
+        key = response_cache.detail_key(self.recipe.pk)
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+        response_cache.set(key, {
+            'content': b'{"title": "Soup"}', 'content_type': 'application/json',
+            'etag': None, 'last_modified': None,
+        })
+        self.assertEqual(self.get(url, 2).json()['title'], 'Stew')
+
+    def test_detail_dropped_on_delete(self):
+        url = reverse('recipe-detail', args=[self.recipe.pk])
+        self.get(url, 2)
+        self.recipe.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_list_pages_invalidated_by_any_recipe(self):
+        url = reverse('recipe-list-create')
+        self.get(url, 2)
+        self.get(url, 0)
+        Recipe.objects.create(title='Salad', ingredients='lettuce', instructions='Toss.')
+        response = self.get(url, 2)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_generator_is_deterministic(self):
+        self.assertEqual(
+            RecipeGenerator(7).ingredient_lines(50),
+            RecipeGenerator(7).ingredient_lines(50)
+        )
+        self.assertNotEqual(
+            RecipeGenerator(7).ingredient_lines(50),
+            RecipeGenerator(8).ingredient_lines(50)
+        )
+
+    def test_compare_flags_regressions_over_threshold(self):
+        baseline = {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'gone': {'median': 1.0}}
+        current = {'a': {'median': 1.05}, 'b': {'median': 1.5}, 'new': {'median': 1.0}}
+        rows = compare(baseline, current, threshold=0.1)
+        self.assertEqual([row['name'] for row in rows], ['a', 'b'])
+        self.assertEqual([row['regressed'] for row in rows], [False, True])
+
+
+@override_settings(REQUEST_PROFILING={
+    'ENABLED': True, 'SAMPLE_RATE': 0.0, 'PROFILE_DIR': None, 'KEEP_SLOWEST': 0,
+})
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        conversion_cache.clear()
+        cache.clear()
+
+    def test_server_timing_reports_sql_and_spans(self):
+        with self.assertLogs('healthy_recipe_converter.profiling', 'INFO') as logs:
+            response = APIClient().post('/api/recipes/convert/', {
+                'ingredients': '1 cup butter', 'instructions': 'Melt the butter.'
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics[:2], ['total', 'db'])
+        self.assertIn('convert', metrics)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['route'], 'api/recipes/convert/')
+        self.assertEqual(record['queries'], 0)
+
+    def test_disabled_middleware_is_removed(self):
+        with override_settings(REQUEST_PROFILING={'ENABLED': False}):
+            response = APIClient().get('/api/recipes/recipes/')
+        self.assertNotIn('Server-Timing', response)
+
+
+class ImportRecipesTests(TestCase):
+    def import_lines(self, *records, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(record) for record in records))
+        self.addCleanup(os.remove, f.name)
+        err = StringIO()
+        call_command('import_recipes', f.name, workers=0, stdout=StringIO(), stderr=err, **options)
+        return f.name, err.getvalue()
+
+    def test_records_with_non_text_fields_are_skipped(self):
+        _, errors = self.import_lines(
+            {'title': 5, 'ingredients': '1 cup butter'},
+            {'title': 'Cake', 'ingredients': ['butter']},
+            {'title': 'Toast', 'ingredients': '1 tbsp butter'},
+        )
+        self.assertEqual(list(Recipe.objects.values_list('title', flat=True)), ['Toast'])
+        self.assertIn('record 1: title must be text', errors)
+        self.assertIn('record 2: ingredients must be text', errors)
+
+    def test_progress_is_committed_with_each_batch(self):
+        records = [{'title': f'Recipe {i}', 'ingredients': '1 cup sugar'} for i in range(5)]
+        path, _ = self.import_lines(*records, batch_size=2)
+        self.assertEqual(ImportProgress.objects.get(name=path).records, 5)
+        self.assertEqual(Recipe.objects.count(), 5)
+
+        # A rerun resumes after the committed records instead of repeating them
+        call_command('import_recipes', path, workers=0, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Recipe.objects.count(), 5)
+
+
+class ExplainQueriesTests(TestCase):
+    def test_explains_every_endpoint(self):
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', stdout=StringIO())
+        user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        Recipe.objects.create(user=user, title='Soup', ingredients='1 onion', instructions='')
+        GroceryList.objects.create(user=user, name='Weekly')
+        stdout = StringIO()
+        call_command('explain_queries', '--user', 'cook', verbosity=2, stdout=stdout)
+        for name in ('recipe-list', 'recipe-detail', 'saved-recipe-list', 'grocery-list', 'grocery-list-items'):
+            self.assertRegex(stdout.getvalue(), rf'(?m)^{name}: ')
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        other = User.objects.create_user('baker', 'baker@example.com', 'password')
+        self.recipe = Recipe.objects.create(
+            title='Soup', ingredients='1 onion', instructions='Boil.', converted_ingredients='1 onion'
+        )
+        self.saved = SavedRecipe.objects.create(user=self.user, recipe=self.recipe)
+        SavedRecipe.objects.create(user=other, recipe=self.recipe)
+
+        self.weekly = GroceryList.objects.create(user=self.user, name='Weekly')
+        self.flour = GroceryItem.objects.create(grocery_list=self.weekly, ingredient='flour', category='pantry')
+        self.milk = GroceryItem.objects.create(grocery_list=self.weekly, ingredient='milk', category='dairy')
+        self.empty = GroceryList.objects.create(user=self.user, name='Empty')
+        GroceryItem.objects.create(
+            grocery_list=GroceryList.objects.create(user=other, name='Theirs'), ingredient='salt'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, name, output):
+        response = self.client.get(reverse(name), {'output': output})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_saved_recipes_ndjson(self):
+        records = [json.loads(line) for line in self.export('saved-recipe-export', 'ndjson').splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['id'], self.saved.pk)
+        self.assertEqual((records[0]['recipe'], records[0]['title']), (self.recipe.pk, 'Soup'))
+
+    def test_saved_recipes_csv(self):
+        rows = list(csv.DictReader(StringIO(self.export('saved-recipe-export', 'csv'))))
+        self.assertEqual([(row['id'], row['title']) for row in rows], [(str(self.saved.pk), 'Soup')])
+
+    def test_grocery_lists_ndjson_nests_items(self):
+        records = [json.loads(line) for line in self.export('grocery-list-export', 'ndjson').splitlines()]
+        self.assertEqual([record['list_name'] for record in records], ['Weekly', 'Empty'])
+        self.assertEqual(
+            [(item['id'], item['ingredient']) for item in records[0]['items']],
+            [(self.milk.pk, 'milk'), (self.flour.pk, 'flour')]
+        )
+        self.assertEqual(records[1]['items'], [])
+
+    def test_grocery_lists_csv_has_one_row_per_item(self):
+        rows = list(csv.DictReader(StringIO(self.export('grocery-list-export', 'csv'))))
+        self.assertEqual(
+            [(row['list_name'], row['item_ingredient']) for row in rows],
+            [('Weekly', 'milk'), ('Weekly', 'flour'), ('Empty', '')]
+        )
+
+    def test_unknown_output(self):
+        response = self.client.get(reverse('grocery-list-export'), {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReconvertRecipesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cook = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.baker = User.objects.create_user('baker', 'baker@example.com', 'password')
+        self.stale = self.create_recipe(self.cook, '1 cup butter', '1 cup butter', 'old')
+        self.unchanged = self.create_recipe(self.cook, '2 eggs', '2 eggs', None)
+        self.other = self.create_recipe(self.baker, '1 cup sugar', '1 cup sugar', 'old')
+        self.current = self.create_recipe(
+            self.cook, '1 cup milk', '1 cup milk', SubstitutionEngine(SUBSTITUTIONS).version
+        )
+
+    def create_recipe(self, user, ingredients, converted, version):
+        return Recipe.objects.create(
+            user=user, title='Recipe', ingredients=ingredients, instructions='',
+            converted_ingredients=converted, conversion_version=version
+        )
+
+    def reconvert(self, *args):
+        stdout = StringIO()
+        call_command('reconvert_recipes', '--workers', '0', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def state(self, recipe):
+        recipe.refresh_from_db()
+        names = list(recipe.parsed_ingredients.values_list('name', flat=True))
+        return recipe.converted_ingredients, recipe.conversion_version, names
+
+    def test_stale_recipes_are_reconverted(self):
+        output = self.reconvert()
+        self.assertIn('3 stale recipes', output)
+        self.assertIn('Re-converted 2 of 3 stale recipes', output)
+        version = SubstitutionEngine(SUBSTITUTIONS).version
+        self.assertEqual(self.state(self.stale), ('1 cup olive oil', version, ['olive oil']))
+        self.assertEqual(self.state(self.other), ('1 cup stevia', version, ['stevia']))
+        self.assertEqual(self.state(self.unchanged), ('2 eggs', version, ['eggs']))
+        self.assertIn('Would re-convert 0 of 0', self.reconvert('--dry-run'))
+
+    def test_dry_run_writes_nothing(self):
+        before = list(Recipe.objects.order_by('pk').values())
+        output = self.reconvert('--dry-run')
+        self.assertIn('Would re-convert 2 of 3 stale recipes', output)
+        self.assertEqual(list(Recipe.objects.order_by('pk').values()), before)
+        self.assertEqual(self.state(self.stale)[2], ['butter'])
+
+    def test_user_scoping(self):
+        self.assertIn('Re-converted 1 of 2 stale recipes', self.reconvert('--user', 'cook'))
+        self.assertEqual(self.state(self.other)[:2], ('1 cup sugar', 'old'))
+        with self.assertRaises(CommandError):
+            self.reconvert('--user', 'nobody')
+
+    def test_recipes_edited_during_the_run_are_skipped(self):
+        reconvert_batch = reconvert_recipes.reconvert_batch
+
+        def edit_then_convert(rows):
+            results = reconvert_batch(rows)
+            Recipe.objects.filter(pk=self.stale.pk).update(
+                converted_ingredients='1 cup ghee', updated_at=timezone.now()
+            )
+            return results
+
+        with mock.patch.object(reconvert_recipes, 'reconvert_batch', edit_then_convert):
+            output = self.reconvert()
+        self.assertIn('1 edited meanwhile and skipped', output)
+        self.assertEqual(self.state(self.stale), ('1 cup ghee', 'old', ['butter']))
+        self.assertEqual(self.state(self.other)[0], '1 cup stevia')
+
+
+class GroceryListItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        self.items = [
+            GroceryItem.objects.create(grocery_list=self.grocery_list, ingredient=name, checked=checked)
+            for name, checked in [('onion', False), ('leek', True)]
+        ]
+        self.url = reverse('grocery-item-create', args=[self.grocery_list.pk])
+
+    def test_bulk_patch_changes_only_differing_rows(self):
+        ids = [item.pk for item in self.items]
+        response = self.client.patch(self.url, {'ids': ids, 'changes': {'checked': True}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [self.items[0].pk])
+
+    def test_malformed_bodies_are_rejected(self):
+        pk = self.items[0].pk
+        for body in (
+            [pk],
+            {'ids': [pk], 'changes': {}},
+            {'ids': [pk, pk], 'changes': {'checked': True}},
+            {'items': [{'id': pk, 'quantity': '1'}, {'id': pk, 'quantity': '2'}]},
+        ):
+            with self.subTest(body=body):
+                response = self.client.patch(self.url, body, format='json')
+                self.assertEqual(response.status_code, 400)
+        response = self.client.delete(self.url, [pk], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(GroceryItem.objects.filter(quantity__isnull=False).exists())
+
+    def test_missing_list_is_not_found(self):
+        url = reverse('grocery-item-create', args=[self.grocery_list.pk + 1])
+        response = self.client.post(url, {'ingredient': '2 carrots'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class BatchConvertTests(TestCase):
+    url = '/api/recipes/convert/batch/'
+
+    def lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_non_array_bodies_are_rejected(self):
+        for body in (5, 'butter', {'recipes': 3}, {'ingredients': '1 cup butter'}):
+            with self.subTest(body=body):
+                response = APIClient().post(self.url, body, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_bad_items_get_an_error_line(self):
+        response = APIClient().post(self.url, [
+            {'ingredients': 5},
+            'butter',
+            {'id': 'a', 'ingredients': '1 cup butter', 'instructions': 'Melt the butter.'},
+        ], format='json')
+        lines = self.lines(response)
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertIn('error', lines[0])
+        self.assertIn('error', lines[1])
+        self.assertEqual(lines[2]['id'], 'a')
+        self.assertEqual(lines[2]['converted_ingredients'], '1 cup olive oil')
+
+    def test_ndjson_body(self):
+        body = '{"ingredients": "2 cups sugar"}\nnot json\n'
+        response = APIClient().post(self.url, body, content_type='application/x-ndjson')
+        lines = self.lines(response)
+        self.assertEqual(lines[0]['converted_ingredients'], '2 cups stevia')
+        self.assertIn('error', lines[1])
+
+    def test_ndjson_line_with_invalid_utf8(self):
+        body = b'{"ingredients": "1 cup butter"}\n{"ingredients": "\xff"}\n{"ingredients": "sugar"}\n'
+        response = APIClient().post(self.url, body, content_type='application/x-ndjson')
+        lines = self.lines(response)
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertIn('error', lines[1])
+        self.assertEqual(lines[2]['converted_ingredients'], 'stevia')
+
+
+class ConvertTests(TestCase):
+    url = '/api/recipes/convert/'
+
+    def setUp(self):
+        conversion_cache.clear()
+        cache.clear()
+
+    def test_non_string_fields_are_rejected(self):
+        for body in ({'ingredients': 5}, {'ingredients': None}, {'instructions': ['Mix.']}):
+            with self.subTest(body=body):
+                response = APIClient().post(self.url, body, format='json')
+                self.assertEqual(response.status_code, 400)
+        response = APIClient().post(self.url, [{'ingredients': '1 cup butter'}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_repeat_conversion_is_a_cache_hit(self):
+        body = {'ingredients': '1 cup butter', 'instructions': ''}
+        first = APIClient().post(self.url, body, format='json')
+        second = APIClient().post(self.url, body, format='json')
+        self.assertEqual(first['X-Conversion-Cache'], 'miss')
+        self.assertEqual(second['X-Conversion-Cache'], 'hit')
+        self.assertEqual(second.data['converted_ingredients'], '1 cup olive oil')
+
+    def test_case_folded_input(self):
+        response = APIClient().post(self.url, {'ingredients': 'ſugar'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['converted_ingredients'], 'stevia')
+
+    def test_key_rejects_non_strings(self):
+        with self.assertRaises(TypeError):
+            conversion_cache.make_key(None, '')
+
+
+def sequential_substitute(rules, text):
+    """The original conversion loop, which SubstitutionEngine must match."""
+    for pattern, replacement in rules:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return text
+
+
+class SubstitutionEngineTests(SimpleTestCase):
+    def assert_equivalent(self, rules, texts):
+        engine = SubstitutionEngine(rules)
+        for text in texts:
+            with self.subTest(rules=rules, text=text):
+                self.assertEqual(engine.convert(text), sequential_substitute(rules, text))
+
+    def test_default_rules(self):
+        self.assert_equivalent(SUBSTITUTIONS, [
+            '', '1 cup Whole Milk\n2 tbsp BUTTER, softened',
+            'vegetable butter and vegetable oil', 'buttermilk with sugar-free white flour',
+        ])
+
+    def test_list_order_wins_for_overlapping_rules(self):
+        rules = [(r'\bcream\b', 'x'), (r'\bheavy cream\b', 'coconut cream')]
+        self.assertEqual(SubstitutionEngine(rules).convert('heavy cream'), 'heavy x')
+        self.assert_equivalent(rules, ['cream', 'heavy cream', 'sour cream, heavy cream'])
+
+    def test_chained_rules_apply_in_turn(self):
+        rules = [(r'\bbutter\b', 'margarine'), (r'\bmargarine\b', 'olive oil')]
+        self.assertEqual(SubstitutionEngine(rules).convert('butter'), 'olive oil')
+
+    def test_pattern_rules_keep_their_place(self):
+        rules = [(r'\bbut\w+', 'fat'), (r'\bbutter\b', 'oil'), (r'(\d+) cups?', r'\1 c')]
+        self.assert_equivalent(rules, ['2 cups butter', 'butterscotch', '1 cup sugar'])
+
+    def test_case_folding_matches_re(self):
+        texts = ['ſugar', 'SUGAR ſUGAR', 'Straße STRASSE straẞe', 'İ milk', 'Kelvin \u212aelvin']
+        self.assert_equivalent(SUBSTITUTIONS, texts)
+        self.assert_equivalent([(r'\bstraße\b', 'road'), (r'\bkelvin\b', 'k')], texts)
+        self.assert_equivalent([(r'\bſugar\b', 'a'), (r'\bsugar\b', 'b')], texts)
+        self.assert_equivalent([(r'\bsugar\b', 'ſugar'), (r'\bſugar\b', 'b')], texts)
+
+    def test_random_literal_rule_sets(self):
+        random = Random(1234)
+        vocabulary = ['milk', 'whole', 'cream', 'heavy', 'butter', 'oil', 'olive', 'sugar']
+        for _ in range(200):
+            rules = [
+                (r'\b' + ' '.join(random.sample(vocabulary, random.randint(1, 2))) + r'\b',
+                 ' '.join(random.sample(vocabulary, random.randint(1, 2))))
+                for _ in range(random.randint(1, 5))
+            ]
+            texts = [' '.join(random.choices(vocabulary, k=8)) for _ in range(5)]
+            self.assert_equivalent(rules, texts)
+
+
+# The async views are only routed when ASYNC_VIEWS is set at startup, so
+# AsyncViewTests mounts them here instead
+urlpatterns = [
+    path('api/recipes/recipes/', AsyncRecipeListView.as_view()),
+    path('api/recipes/recipes/<int:pk>/', AsyncRecipeDetailView.as_view()),
+    path('api/recipes/convert/', AsyncRecipeConvertView.as_view()),
+    path('api/recipes/saved-recipes/', AsyncSavedRecipeListView.as_view()),
+    path('api/recipes/grocery-lists/', AsyncGroceryListView.as_view()),
+    path('api/recipes/grocery-lists/<int:pk>/', AsyncGroceryListDetailView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        conversion_cache.clear()
+        self.recipe = Recipe.objects.create(
+            title='Soup', ingredients='1 onion', instructions='Boil.'
+        )
+
+    async def test_detail(self):
+        url = f'/api/recipes/recipes/{self.recipe.pk}/'
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Soup')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertIn('Last-Modified', response)
+
+        cached = await self.async_client.get(url)
+        self.assertEqual(cached['X-Response-Cache'], 'hit')
+        not_modified = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+        missing = await self.async_client.get(f'/api/recipes/recipes/{self.recipe.pk + 1}/')
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_list(self):
+        await Recipe.objects.acreate(title='Stew', ingredients='2 carrots', instructions='Simmer.')
+        response = await self.async_client.get('/api/recipes/recipes/?fields=id,title')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([recipe['title'] for recipe in response.json()['results']], ['Stew', 'Soup'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        not_modified = await self.async_client.get(
+            '/api/recipes/recipes/?fields=id,title', headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_convert(self):
+        response = await self.async_client.post(
+            '/api/recipes/convert/', {'ingredients': '1 cup butter', 'instructions': 'Melt.'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['converted_ingredients'], '1 cup olive oil')
+        self.assertEqual(response['X-Conversion-Cache'], 'miss')
+
+        for body in ([{'ingredients': '1 cup butter'}], {'ingredients': 5}):
+            with self.subTest(body=body):
+                response = await self.async_client.post(
+                    '/api/recipes/convert/', body, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 400)
+
+    async def assert_conditional(self, url, headers):
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Authorization', response['Vary'])
+        not_modified = await self.async_client.get(
+            url, headers={**headers, 'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        return response
+
+    async def test_per_user_views_answer_conditional_gets(self):
+        user = await User.objects.acreate_user('cook', 'cook@example.com', 'password')
+        token = await sync_to_async(tokens_for_user)(user)
+        headers = {'Authorization': f'Bearer {token.access_token}'}
+        await SavedRecipe.objects.acreate(user=user, recipe=self.recipe)
+        grocery_list = await GroceryList.objects.acreate(user=user, name='Weekly')
+        await GroceryItem.objects.acreate(grocery_list=grocery_list, ingredient='onion')
+
+        saved = await self.assert_conditional('/api/recipes/saved-recipes/', headers)
+        self.assertEqual(len(saved.json()), 1)
+        lists = await self.assert_conditional('/api/recipes/grocery-lists/', headers)
+        self.assertEqual(lists.json()[0]['name'], 'Weekly')
+        url = f'/api/recipes/grocery-lists/{grocery_list.pk}/'
+        detail = await self.assert_conditional(url, headers)
+        self.assertIn('Last-Modified', detail)
+
+        # An edited item changes the list's ETag
+        await GroceryItem.objects.acreate(grocery_list=grocery_list, ingredient='leek')
+        changed = await self.async_client.get(url, headers={**headers, 'If-None-Match': detail['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()['items']), 2)
+
+        missing = await self.async_client.get(f'/api/recipes/grocery-lists/{grocery_list.pk + 1}/', headers=headers)
+        self.assertEqual(missing.status_code, 404)
+
+
+class GroceryListJobTests(TestCase):
+    lease = timedelta(minutes=5)
+
+    def setUp(self):
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        self.job = GroceryListJob.enqueue(self.grocery_list)
+
+    def expire_lease(self):
+        GroceryListJob.objects.filter(pk=self.job.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_claim_is_exclusive_until_the_lease_expires(self):
+        job = GroceryListJob.claim_next(self.lease)
+        self.assertEqual((job.pk, job.status, job.attempts), (self.job.pk, 'running', 1))
+        self.assertIsNone(GroceryListJob.claim_next(self.lease))
+
+        self.expire_lease()
+        job = GroceryListJob.claim_next(self.lease)
+        self.assertEqual((job.pk, job.attempts), (self.job.pk, 2))
+        self.assertTrue(job.run())
+        self.assertEqual(GroceryList.objects.get(pk=self.grocery_list.pk).status, 'ready')
+
+    def test_abandoned_final_attempt_fails_the_job(self):
+        for _ in range(self.job.max_attempts):
+            self.assertIsNotNone(GroceryListJob.claim_next(self.lease))
+            self.expire_lease()
+        self.assertIsNone(GroceryListJob.claim_next(self.lease))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'failed')
+        self.assertEqual(GroceryList.objects.get(pk=self.grocery_list.pk).status, 'failed')
+
+    def test_stale_worker_writes_nothing(self):
+        stale = GroceryListJob.claim_next(self.lease)
+        self.expire_lease()
+        current = GroceryListJob.claim_next(self.lease)
+        with mock.patch.object(GroceryList, 'generate_items') as generate_items:
+            self.assertFalse(stale.run())
+        generate_items.assert_not_called()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.attempts), ('running', 2))
+
+        self.assertTrue(current.run())
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'done')
+        self.assertEqual(GroceryList.objects.get(pk=self.grocery_list.pk).status, 'ready')
+
+    def test_failed_runs_are_retried_then_fail(self):
+        job = GroceryListJob.claim_next(self.lease)
+        with mock.patch.object(GroceryList, 'generate_items', side_effect=RuntimeError('boom')):
+            self.assertFalse(job.run())
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'pending')
+            self.assertGreater(job.run_after, timezone.now())
+
+            GroceryListJob.objects.filter(pk=job.pk).update(
+                attempts=job.max_attempts - 1, run_after=timezone.now()
+            )
+            job = GroceryListJob.claim_next(self.lease)
+            self.assertFalse(job.run())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('boom', job.last_error)
+        self.assertEqual(GroceryList.objects.get(pk=self.grocery_list.pk).status, 'failed')
+
+
+class SlowestProfilesTests(SimpleTestCase):
+    def test_keeps_only_the_slowest_dumps(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        slowest = SlowestProfiles(directory, keep=2)
+        request = RequestFactory().get('/api/recipes/recipes/')
+        paths = [
+            slowest.offer(duration, request, cProfile.Profile())
+            for duration in (0.3, 0.1, 0.2, 0.05)
+        ]
+        self.assertIsNone(paths[3])
+        kept = sorted(os.path.basename(path) for path in (paths[0], paths[2]))
+        self.assertEqual(sorted(os.listdir(directory)), kept)
+
+    def test_keep_zero_writes_nothing(self):
+        slowest = SlowestProfiles(tempfile.gettempdir(), keep=0)
+        request = RequestFactory().get('/')
+        self.assertIsNone(slowest.offer(1.0, request, cProfile.Profile()))
+
+
+
+class HelloView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response({'hello': 'world'})
+
+
+class MixinDefaultsTests(SimpleTestCase):
+    def test_views_without_validators_skip_the_check(self):
+        view = type('PlainView', (ConditionalGetMixin, HelloView), {}).as_view()
+        response = view(RequestFactory().get('/', headers={'If-None-Match': '*'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_views_without_a_cache_key_are_not_cached(self):
+        view = type('PlainView', (CachedResponseMixin, HelloView), {}).as_view()
+        response = view(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Response-Cache', response)
+
+
+class IncrementalGroceryListTests(TestCase):
+    """Adding and removing recipes one at a time matches a full rebuild."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.pancakes = self.create_recipe('Pancakes', '2 cups flour\n1 tbsp butter\n2 eggs')
+        self.bread = self.create_recipe('Bread', '1 cup flour\n2 tsp butter\n1 tsp salt')
+
+    def create_recipe(self, title, ingredients):
+        return Recipe.objects.create(
+            user=self.user, title=title, ingredients=ingredients, instructions='',
+            converted_ingredients=ingredients
+        )
+
+    def rebuilt(self, *recipes):
+        grocery_list = GroceryList.objects.create(user=self.user, name='Rebuilt')
+        grocery_list.recipes.set(recipes)
+        grocery_list.generate_items()
+        return grocery_list
+
+    def items(self, grocery_list):
+        return sorted(
+            (item.ingredient.lower(), item.quantity, item.unit, item.base_unit)
+            for item in grocery_list.items.filter(custom=False)
+        )
+
+    def test_add_matches_rebuild(self):
+        grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        self.assertTrue(grocery_list.add_recipe(self.pancakes))
+        self.assertTrue(grocery_list.add_recipe(self.bread))
+        self.assertFalse(grocery_list.add_recipe(self.bread))
+        self.assertEqual(self.items(grocery_list), self.items(self.rebuilt(self.pancakes, self.bread)))
+        flour = grocery_list.items.get(ingredient__iexact='flour')
+        self.assertEqual((flour.quantity, flour.unit), ('3.0', 'cup'))
+
+    def test_remove_restores_previous_totals(self):
+        grocery_list = self.rebuilt(self.pancakes)
+        before = self.items(grocery_list)
+        custom = GroceryItem.objects.create(grocery_list=grocery_list, ingredient='napkins', custom=True)
+        grocery_list.items.filter(ingredient__iexact='flour').update(checked=True)
+
+        grocery_list.add_recipe(self.bread)
+        self.assertTrue(grocery_list.remove_recipe(self.bread))
+        self.assertFalse(grocery_list.remove_recipe(self.bread))
+        self.assertEqual(self.items(grocery_list), before)
+        self.assertTrue(grocery_list.items.get(ingredient__iexact='flour').checked)
+        self.assertTrue(GroceryItem.objects.filter(pk=custom.pk).exists())
+        self.assertFalse(grocery_list.items.filter(ingredient__iexact='salt').exists())
+
+    def test_edits_lock_the_list_first(self):
+        grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        with mock.patch.object(GroceryList, 'lock', autospec=True, side_effect=GroceryList.lock) as lock:
+            grocery_list.add_recipe(self.pancakes)
+            grocery_list.add_recipe(self.pancakes)
+            grocery_list.remove_recipe(self.pancakes)
+        self.assertEqual(lock.call_count, 3)
+
+    def test_add_endpoint_rejects_non_object_bodies(self):
+        grocery_list = GroceryList.objects.create(user=self.user, name='Weekly')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('grocery-list-recipe-add', args=[grocery_list.pk])
+        for body in ([self.pancakes.pk], 'x', None):
+            with self.subTest(body=body):
+                response = client.post(url, json.dumps(body), content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        response = client.post(url, {'recipe': self.pancakes.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+class RecipeSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cake = self.create_recipe('Butter Cake', '2 cups flour\n1 cup sugar')
+        self.bread = self.create_recipe('Bread', '3 cups flour\n2 tbsp butter')
+        self.soup = self.create_recipe('Onion Soup', '4 onions')
+
+    def create_recipe(self, title, ingredients):
+        return Recipe.objects.create(title=title, ingredients=ingredients, instructions='')
+
+    def search(self, **params):
+        response = APIClient().get(reverse('recipe-search'), params)
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.json()]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search(q='butter'), [self.cake.pk, self.bread.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search(q='flour and butter'), [self.cake.pk, self.bread.pk])
+        self.assertEqual(self.search(q='bread butter'), [self.bread.pk])
+        self.assertEqual(self.search(q='the'), [])
+        self.assertEqual(self.search(q=''), [])
+
+    def test_index_follows_writes(self):
+        self.soup.title = 'Leek Soup'
+        self.soup.save()
+        self.bread.delete()
+        self.assertEqual(self.search(q='leek'), [self.soup.pk])
+        self.assertEqual(self.search(q='onion'), [self.soup.pk])
+        self.assertEqual(self.search(q='butter'), [self.cake.pk])
+
+    def test_limit_and_fields(self):
+        response = APIClient().get(reverse('recipe-search'), {'q': 'butter', 'limit': 1, 'fields': 'id,title'})
+        self.assertEqual(response.json(), [{'id': self.cake.pk, 'title': 'Butter Cake'}])
+
+
+class RecipePaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recipes = [self.create_recipe(f'Recipe {i}') for i in range(5)]
+        self.client = APIClient()
+
+    def create_recipe(self, title):
+        return Recipe.objects.create(title=title, ingredients='1 cup flour', instructions='')
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, page):
+        return [recipe['id'] for recipe in page['results']]
+
+    def test_pages_newest_first(self):
+        newest_first = [recipe.pk for recipe in reversed(self.recipes)]
+        first = self.get(reverse('recipe-list-create'), {'page_size': 2})
+        self.assertEqual(self.ids(first), newest_first[:2])
+        self.assertIsNone(first['previous'])
+
+        second = self.get(first['next'])
+        self.assertEqual(self.ids(second), newest_first[2:4])
+        last = self.get(second['next'])
+        self.assertEqual(self.ids(last), newest_first[4:])
+        self.assertIsNone(last['next'])
+        self.assertEqual(self.ids(self.get(last['previous'])), newest_first[2:4])
+
+    def test_page_size_is_capped(self):
+        for i in range(5, 105):
+            self.create_recipe(f'Recipe {i}')
+        self.assertEqual(len(self.get(reverse('recipe-list-create'))['results']), 20)
+        page = self.get(reverse('recipe-list-create'), {'page_size': 500})
+        self.assertEqual(len(page['results']), 100)
+
+    def test_inserts_do_not_shift_pages(self):
+        first = self.get(reverse('recipe-list-create'), {'page_size': 2})
+        self.create_recipe('Brand new')
+        second = self.get(first['next'])
+        self.assertEqual(self.ids(second), [self.recipes[2].pk, self.recipes[1].pk])
+
+
+class ParsedIngredientTests(TestCase):
+    def setUp(self):
+        self.recipe = Recipe.objects.create(
+            title='Pancakes', ingredients='', instructions='',
+            converted_ingredients='2 cups flour\n\n1 tbsp olive oil\nsalt'
+        )
+
+    def rows(self, recipe):
+        return list(recipe.parsed_ingredients.values_list('position', 'quantity', 'unit', 'name'))
+
+    def test_rows_follow_converted_ingredients(self):
+        self.assertEqual(self.rows(self.recipe), [
+            (0, 2.0, 'cups', 'flour'), (1, 1.0, 'tbsp', 'olive oil'), (2, None, None, 'salt')
+        ])
+        self.recipe.converted_ingredients = '3 eggs'
+        self.recipe.save(update_fields=['converted_ingredients'])
+        self.assertEqual(self.rows(self.recipe), [(0, 3.0, None, 'eggs')])
+
+    def test_other_field_updates_skip_rebuild(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(converted_ingredients='3 eggs')
+        self.recipe.refresh_from_db()
+        self.recipe.title = 'Crepes'
+        with self.assertNumQueries(1):
+            self.recipe.save(update_fields=['title'])
+        self.assertEqual(len(self.rows(self.recipe)), 3)
+
+    def test_backfill(self):
+        other = Recipe.objects.create(
+            title='Omelette', ingredients='', instructions='', converted_ingredients='3 eggs'
+        )
+        ParsedIngredient.objects.all().delete()
+        Recipe.objects.filter(pk=other.pk).update(converted_ingredients='4 eggs')
+        stdout = StringIO()
+        call_command('backfill_parsed_ingredients', '--batch-size', '1', stdout=stdout)
+        self.assertIn('Successfully parsed 4 ingredients from 2 recipes', stdout.getvalue())
+        self.assertEqual(self.rows(other), [(0, 4.0, None, 'eggs')])
+
+        # Without --all, recipes that already have rows are left alone
+        Recipe.objects.filter(pk=other.pk).update(converted_ingredients='5 eggs')
+        call_command('backfill_parsed_ingredients', stdout=StringIO())
+        self.assertEqual(self.rows(other), [(0, 4.0, None, 'eggs')])
+        call_command('backfill_parsed_ingredients', '--all', stdout=StringIO())
+        self.assertEqual(self.rows(other), [(0, 5.0, None, 'eggs')])
+
+
+def linear_find(names, name, accept=lambda key: True):
+    """The scan SimilarIngredientIndex replaced: first similar name, in insertion order."""
+    words = name.split()
+    for key, existing in names.items():
+        if ((name in existing or existing in name or
+                any(word in existing.split() for word in words)) and accept(key)):
+            return key
+    return None
+
+
+class SimilarIngredientIndexTests(SimpleTestCase):
+    VOCABULARY = ['oil', 'olive', 'olive oil', 'egg', 'eggs', 'salt', 'sea salt',
+                  'brown sugar', 'sugar', 'butter', 'peanut butter', 'nut', 'an', '']
+
+    def test_matches_linear_scan(self):
+        rng = Random(7)
+        for _ in range(50):
+            index = SimilarIngredientIndex()
+            names = {}
+            for key in range(rng.randint(1, 12)):
+                name = rng.choice(self.VOCABULARY)
+                if rng.random() < 0.3:
+                    name = f'{name} {rng.choice(self.VOCABULARY)}'.strip()
+                index.add(key, name)
+                names[key] = name
+            banned = rng.randrange(len(names))
+            for name in self.VOCABULARY:
+                self.assertEqual(index.find(name), linear_find(names, name), name)
+                self.assertEqual(
+                    index.find(name, lambda key: key != banned),
+                    linear_find(names, name, lambda key: key != banned),
+                    name
+                )
+
+    def test_combine_merges_first_similar_ingredient(self):
+        lines = ['1 cup olive oil', '2 eggs', '1 tbsp oil', '1 egg', '1 tsp sea salt', '1 tsp salt', '1 cup brown sugar']
+        combined = combineIngredients([parseIngredient(line) for line in lines])
+        self.assertEqual(
+            [(item['ingredient'], item['quantities']) for item in combined],
+            [('eggs', [2.0, 1.0]), ('brown sugar', [1.0]), ('olive oil', [1.0, 1.0]), ('sea salt', [1.0, 1.0])]
+        )
+
+
+def linear_categorize(table, ingredient):
+    """The keyword scan CategoryMatcher replaced."""
+    for category, items in table.items():
+        if any(item in ingredient or ingredient in item for item in items):
+            return category
+    return 'other'
+
+
+class CategoryMatcherTests(SimpleTestCase):
+    FRAGMENTS = ['ice', 'ice cream', 'cream', 'rice', 'pr', 'sp', 'c', 'ream', 'oil',
+                 'soil', 'olive', 'live', 'milk', 'almond milk', 'soy', ' ', 'e']
+
+    def random_text(self, rng, words):
+        """Words glued together with or without spaces, so keywords straddle word boundaries."""
+        text = ''
+        for _ in range(rng.randint(0, 4)):
+            text += rng.choice(['', ' ']) + rng.choice(words)
+        return text.strip()
+
+    def test_matches_linear_scan_on_default_table(self):
+        rng = Random(42)
+        keywords = [item for items in categories.values() for item in items]
+        texts = ['', 'ice', 'frozen peas and ice cream', 'sparkling water', 'salt', 'ream', 'a']
+        texts += [self.random_text(rng, keywords + self.FRAGMENTS) for _ in range(500)]
+        matcher = CategoryMatcher(categories)
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(matcher.match(text), linear_categorize(categories, text))
+
+    def test_matches_linear_scan_on_random_tables(self):
+        rng = Random(2024)
+        for _ in range(200):
+            table = {
+                f'category{i}': rng.sample(self.FRAGMENTS, rng.randint(0, 4))
+                for i in range(rng.randint(1, 5))
+            }
+            matcher = CategoryMatcher(table)
+            for _ in range(20):
+                text = self.random_text(rng, self.FRAGMENTS)
+                with self.subTest(table=table, text=text):
+                    self.assertEqual(matcher.match(text), linear_categorize(table, text))
+
+
+class UnitFamilyTests(SimpleTestCase):
+    def combine(self, *lines):
+        return [
+            (item['ingredient'], item['displayQuantity'], item['unit'])
+            for item in combineIngredients([parseIngredient(line) for line in lines])
+        ]
+
+    def test_units_in_one_family_merge(self):
+        self.assertEqual(self.combine('1 cup flour', '2 tbsp flour'), [('flour', '1.13', 'cup')])
+        self.assertEqual(self.combine('500 g sugar', '1 kg sugar'), [('sugar', '1.5', 'kg')])
+
+    def test_families_stay_separate(self):
+        self.assertEqual(
+            self.combine('1 cup flour', '100 g flour', '2 tbsp flour'),
+            [('flour', '1.13', 'cup'), ('flour', '3.53', 'oz')]
+        )
+        self.assertEqual(
+            self.combine('2 eggs', '1 cup eggs'),
+            [('eggs', None, None), ('eggs', '1.0', 'cup')]
+        )
+
+    def test_sum_quantities_matches_normalize_unit(self):
+        quantities = [1, 2, 0.5, 500, 1, 3, 2]
+        units = ['cup', 'TBSP', 'l', 'g', 'kg', 'pinch', 'pinch']
+        expected = {}
+        for quantity, unit in zip(quantities, units):
+            amount, base_unit = normalize_unit(quantity, unit)
+            expected[base_unit] = expected.get(base_unit, 0.0) + amount
+        totals = sum_quantities(quantities, units)
+        self.assertEqual(totals.keys(), expected.keys())
+        for base_unit, total in expected.items():
+            self.assertAlmostEqual(totals[base_unit], total)
+        if ingredient_parser.numpy is not None:
+            with mock.patch.object(ingredient_parser, 'NUMPY_MIN_QUANTITIES', 0):
+                vectorized = sum_quantities(quantities, units)
+            for base_unit, total in totals.items():
+                self.assertAlmostEqual(vectorized[base_unit], total)
+
+
+class ParseIngredientsTests(SimpleTestCase):
+    # Outputs of the original line-at-a-time parser
+    EXPECTED = [
+        ('2 cups flour', 2.0, 'cups', 'flour'),
+        ('- 1 1/2 tbsp olive oil, divided', 1.5, 'tbsp', 'olive oil divided'),
+        ('• 3 eggs (large)', 3.0, None, 'eggs'),
+        ('1/2 tsp salt', 0.5, 'tsp', 'salt'),
+        ('0.5 kg potatoes', 0.5, 'kg', 'potatoes'),
+        ('1.5 L water', 1.5, 'l', 'water'),
+        ('* 2 Cups Sugar', 2.0, 'cups', 'sugar'),
+        ('3/0 cup rice', 0.0, 'cup', 'rice'),
+        ('1 2 apples', 3.0, None, 'apples'),
+        ('salt and pepper', None, None, 'salt and pepper'),
+        ('12', 12.0, None, ''),
+        ('', None, None, ''),
+    ]
+
+    def test_columns_match_line_parser(self):
+        parsed = parse_ingredients(line for line, *_ in self.EXPECTED)
+        self.assertEqual(len(parsed), len(self.EXPECTED))
+        self.assertEqual(list(parsed), [tuple(row) for _, *row in self.EXPECTED])
+        for index, (line, quantity, unit, ingredient) in enumerate(self.EXPECTED):
+            expected = {'quantity': quantity, 'unit': unit, 'ingredient': ingredient}
+            self.assertEqual(parsed.row(index), expected)
+            self.assertEqual(parseIngredient(line), expected)
@@ -1,22 +1,43 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
-    RecipeListCreateView, SavedRecipeListView,
+    RecipeListCreateView, SavedRecipeListView, SavedRecipeExportView,
     SavedRecipeDeleteView, RecipeDetailView,
-    RecipeConvertView, GroceryListView,
-    GroceryListDetailView, GroceryItemCreateView,
+    RecipeSearchView, CacheStatsView, RecipeConvertView, RecipeBatchConvertView, GroceryListView,
+    GroceryListExportView, GroceryListDetailView, GroceryListRecipeAddView, GroceryListRecipeRemoveView,
+    GroceryListJobDetailView, GroceryListItemsView,
     GroceryItemUpdateView, GroceryItemDeleteView
 )
+
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncRecipeListView as RecipeListCreateView,
+        AsyncRecipeDetailView as RecipeDetailView,
+        AsyncSavedRecipeListView as SavedRecipeListView,
+        AsyncRecipeConvertView as RecipeConvertView,
+        AsyncGroceryListView as GroceryListView,
+        AsyncGroceryListDetailView as GroceryListDetailView
+    )
+
 urlpatterns = [
     path('recipes/', RecipeListCreateView.as_view(), name='recipe-list-create'),
     path('recipes/<int:pk>/', RecipeDetailView.as_view(), name='recipe-detail'),
+    path('search/', RecipeSearchView.as_view(), name='recipe-search'),
     path('saved-recipes/', SavedRecipeListView.as_view(), name='saved-recipe-list'),
+    path('saved-recipes/export/', SavedRecipeExportView.as_view(), name='saved-recipe-export'),
     path('saved-recipes/<int:pk>/', SavedRecipeDeleteView.as_view(), name='saved-recipe-delete'),
     path('convert/', RecipeConvertView.as_view(), name='recipe-convert'),
+    path('convert/batch/', RecipeBatchConvertView.as_view(), name='recipe-convert-batch'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
     
     # Grocery list endpoints
     path('grocery-lists/', GroceryListView.as_view(), name='grocery-list'),
+    path('grocery-lists/export/', GroceryListExportView.as_view(), name='grocery-list-export'),
     path('grocery-lists/<int:pk>/', GroceryListDetailView.as_view(), name='grocery-list-detail'),
-    path('grocery-lists/<int:list_id>/items/', GroceryItemCreateView.as_view(), name='grocery-item-create'),
+    path('grocery-lists/<int:pk>/recipes/', GroceryListRecipeAddView.as_view(), name='grocery-list-recipe-add'),
+    path('grocery-lists/<int:pk>/recipes/<int:recipe_id>/', GroceryListRecipeRemoveView.as_view(), name='grocery-list-recipe-remove'),
+    path('grocery-list-jobs/<int:pk>/', GroceryListJobDetailView.as_view(), name='grocery-list-job'),
+    path('grocery-lists/<int:list_id>/items/', GroceryListItemsView.as_view(), name='grocery-item-create'),
     path('grocery-items/<int:pk>/', GroceryItemUpdateView.as_view(), name='grocery-item-update'),
     path('grocery-items/<int:pk>/delete/', GroceryItemDeleteView.as_view(), name='grocery-item-delete'),
 ]
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import hashlib
+import threading
+
+from django.core.cache import caches
+
+
+class ConversionCache:
+    """
+    Two-tier cache for recipe conversions.
+
+    Entries are keyed by a hash of the input text and the substitution rule-set
+    version, so editing SUBSTITUTIONS changes every key and old entries simply
+    stop being read. A bounded in-process LRU sits in front of a shared Django
+    cache backend.
+    """
+
+    def __init__(self, version: str, maxsize: int = 1024,
+                 cache_alias: str = 'default', timeout: Optional[int] = None):
+        self.version = version
+        self.maxsize = maxsize
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, ingredients: str, instructions: str) -> str:
+        if not isinstance(ingredients, str) or not isinstance(instructions, str):
+            raise TypeError('ingredients and instructions must be strings')
+        digest = hashlib.sha256()
+        for part in (self.version, ingredients, instructions):
+            encoded = part.encode('utf-8')
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") differ.
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return f'recipe-convert:{digest.hexdigest()}'
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = caches[self.cache_alias].get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: Dict[str, str]) -> None:
+        caches[self.cache_alias].set(key, value, self.timeout)
+        with self._lock:
+            self._remember(key, value)
+
+    def _remember(self, key: str, value: Dict[str, str]) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
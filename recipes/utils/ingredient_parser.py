@@ -1,7 +1,15 @@
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple
+from bisect import bisect_right
+from collections import deque
 from fractions import Fraction
+from functools import lru_cache
 import re
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional; the pure Python path is used instead
+    numpy = None
+
 # Unit conversion ratios
 unit_conversions = {
     'volume': {
@@ -38,10 +46,29 @@ unit_conversions = {
             'lb': 453.592,
             'pound': 453.592,
             'pounds': 453.592,
+            'lbs': 453.592,
         }
     }
 }
 
+# Flat lookup tables derived from unit_conversions at import time.
+# unit -> (base unit of its family, factor to convert to that base unit)
+unit_factors: Dict[str, Tuple[str, float]] = {
+    unit_name: (data['base_unit'], factor)
+    for data in unit_conversions.values()
+    for unit_name, factor in data['conversions'].items()
+}
+# base unit -> [(unit, factor), ...] largest first; the sort is stable, so the
+# first-listed spelling wins among units of equal size
+display_units: Dict[str, List[Tuple[str, float]]] = {
+    data['base_unit']: sorted(
+        data['conversions'].items(),
+        key=lambda x: x[1],
+        reverse=True
+    )
+    for data in unit_conversions.values()
+}
+
 # Common units of measurement
 units = [
     'cup', 'cups',
@@ -101,6 +128,9 @@ categories = {
 import re
 number_pattern = re.compile(r'(\d+\/\d+|\d*\.?\d+)\s*')
 unit_pattern = re.compile(fr'\b({"|".join(units)})\b', re.IGNORECASE)
+bullet_pattern = re.compile(r'^[-•*]\s*')
+note_pattern = re.compile(r'\(.*?\)')
+token_pattern = re.compile(r'\S+')
 
 def convert_fraction_to_float(fraction_str: str) -> float:
     """Convert a fraction string to a float."""
@@ -114,107 +144,312 @@ def convert_fraction_to_float(fraction_str: str) -> float:
 def normalize_unit(quantity: float, unit: str) -> tuple[float, str]:
     """Convert quantity and unit to base unit if possible."""
     unit = unit.lower()
-    for unit_type, data in unit_conversions.items():
-        if unit in data['conversions']:
-            base_quantity = quantity * data['conversions'][unit]
-            return base_quantity, data['base_unit']
+    if unit in unit_factors:
+        base_unit, factor = unit_factors[unit]
+        return quantity * factor, base_unit
     return quantity, unit
 
+def unit_family(unit: Optional[str]) -> Optional[str]:
+    """Return the base unit `unit` converts to, or `unit` itself if it has none.
+
+    Quantities can be added together when their units share a family.
+    """
+    if not unit:
+        return unit
+    entry = unit_factors.get(unit.lower())
+    return entry[0] if entry else unit.lower()
+
+# Below this many quantities the NumPy call overhead outweighs its speed-up
+NUMPY_MIN_QUANTITIES = 256
+
+def sum_quantities(quantities: Sequence[float], units: Sequence[str]) -> Dict[str, float]:
+    """Normalize parallel arrays of quantities and units, and total them per family.
+
+    Returns a mapping of base unit (or unconvertible unit) to total quantity.
+    """
+    families = []
+    factors = []
+    for unit in units:
+        unit = unit.lower()
+        base_unit, factor = unit_factors.get(unit, (unit, 1))
+        families.append(base_unit)
+        factors.append(factor)
+
+    if numpy is not None and len(quantities) >= NUMPY_MIN_QUANTITIES:
+        names, codes = numpy.unique(numpy.array(families), return_inverse=True)
+        totals = numpy.bincount(
+            codes,
+            weights=numpy.asarray(quantities, dtype=float) * numpy.asarray(factors),
+            minlength=len(names)
+        )
+        return {str(name): float(total) for name, total in zip(names, totals)}
+
+    totals: Dict[str, float] = {}
+    for quantity, base_unit, factor in zip(quantities, families, factors):
+        totals[base_unit] = totals.get(base_unit, 0.0) + quantity * factor
+    return totals
+
+def display_quantity(total: float, base_unit: str) -> tuple[float, str]:
+    """Express a total in base units using the largest unit that is at least 1."""
+    for unit_name, conversion in display_units.get(base_unit, ()):
+        if total >= conversion:
+            return round(total / conversion, 2), unit_name
+    return round(total, 2), base_unit
+
 def combine_quantities(quantities: List[float], unit: str) -> tuple[float, str]:
     """Combine quantities in the same unit."""
     if not quantities:
         return 0.0, unit
-    
-    # Convert all quantities to base unit
-    base_quantities = []
-    base_unit = unit
-    
-    for qty in quantities:
-        base_qty, bu = normalize_unit(qty, unit)
-        base_quantities.append(base_qty)
-        base_unit = bu
-    
-    total = sum(base_quantities)
-    
-    # Convert back to most appropriate unit
-    for unit_type, data in unit_conversions.items():
-        if base_unit == data['base_unit']:
-            # Find the largest unit that gives a reasonable number
-            for unit_name, conversion in sorted(
-                data['conversions'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            ):
-                if total >= conversion:
-                    return round(total / conversion, 2), unit_name
-    
-    return round(total, 2), base_unit
+    ((base_unit, total),) = sum_quantities(quantities, [unit] * len(quantities)).items()
+    return display_quantity(total, base_unit)
+
+class ParsedIngredients:
+    """
+    Columnar result of parse_ingredients.
+
+    Holds parallel lists with one entry per input line, rather than a dict
+    per line. Lines that are blank or contain only a quantity get an empty
+    ingredient name.
+    """
+    __slots__ = ('quantities', 'units', 'ingredients')
+
+    def __init__(self) -> None:
+        self.quantities: List[Optional[float]] = []
+        self.units: List[Optional[str]] = []
+        self.ingredients: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ingredients)
+
+    def __iter__(self):
+        """Iterate over (quantity, unit, ingredient) rows."""
+        return zip(self.quantities, self.units, self.ingredients)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {
+            'quantity': self.quantities[index],
+            'unit': self.units[index],
+            'ingredient': self.ingredients[index]
+        }
+
+def _is_quantity(token: str) -> bool:
+    return token.replace('.', '').isdigit() or '/' in token
+
+def parse_ingredients(lines: Iterable[str]) -> ParsedIngredients:
+    """Parse many ingredient lines into quantity, unit, and ingredient columns."""
+    result = ParsedIngredients()
+    quantities = result.quantities
+    units_column = result.units
+    ingredients = result.ingredients
+
+    for line in lines:
+        # Remove common prefixes and parenthetical notes
+        text = bullet_pattern.sub('', line.lower().strip())
+        text = note_pattern.sub('', text).strip()
+
+        # Extract quantity - handle mixed numbers (e.g., "2 1/2")
+        quantity = None
+        end = 0
+        tokens = token_pattern.finditer(text)
+        token = next(tokens, None)
+        while token and _is_quantity(token.group()):
+            qty_str = token.group()
+            end = token.end()
+            token = next(tokens, None)
+            value = convert_fraction_to_float(qty_str)
+            if qty_str.replace('.', '').isdigit() and token and '/' in token.group():
+                # Handle mixed numbers like "2 1/2"
+                value += convert_fraction_to_float(token.group())
+                end = token.end()
+                token = next(tokens, None)
+            quantity = value if quantity is None else quantity + value
+        ingredient = text[end:].lstrip()
+
+        # Extract unit
+        unit = None
+        unit_match = unit_pattern.match(ingredient)
+        if unit_match:
+            unit = unit_match.group(0).lower()
+            ingredient = ingredient[unit_match.end():]
+
+        # Clean up ingredient name
+        quantities.append(quantity)
+        units_column.append(unit)
+        ingredients.append(' '.join(ingredient.replace(',', '').split()))
+
+    return result
 
 def parseIngredient(ingredientText: str) -> Dict[str, Any]:
     """Parse an ingredient string into quantity, unit, and ingredient name."""
-    ingredientText = ingredientText.lower().strip()
-    
-    # Remove common prefixes and parenthetical notes
-    ingredientText = re.sub(r'^[-•*]\s*', '', ingredientText)
-    ingredientText = re.sub(r'\(.*?\)', '', ingredientText)
-    ingredientText = ingredientText.strip()
-
-    quantity = None
-    unit = None
-    ingredient = ingredientText
-
-    # Extract quantity - handle mixed numbers (e.g., "2 1/2")
-    parts = ingredient.split()
-    quantities = []
-    while parts and (parts[0].replace('.', '').isdigit() or '/' in parts[0]):
-        qty_str = parts.pop(0)
-        if qty_str.replace('.', '').isdigit() and parts and '/' in parts[0]:
-            # Handle mixed numbers like "2 1/2"
-            whole = float(qty_str)
-            fraction = convert_fraction_to_float(parts.pop(0))
-            quantities.append(whole + fraction)
-        else:
-            quantities.append(convert_fraction_to_float(qty_str))
-    
-    ingredient = ' '.join(parts)
-
-    # Extract unit
-    unit_match = unit_pattern.match(ingredient)
-    if unit_match:
-        unit = unit_match.group(0).lower()
-        ingredient = ingredient[unit_match.end():].strip()
-
-    # Clean up ingredient name
-    ingredient = re.sub(r',', '', ingredient)
-    ingredient = re.sub(r'\s+', ' ', ingredient)
-    ingredient = ingredient.strip()
-
-    # Calculate total quantity
-    if quantities:
-        quantity = sum(quantities)
-
-    return {
-        'quantity': quantity,
-        'unit': unit,
-        'ingredient': ingredient
-    }
+    return parse_ingredients((ingredientText,)).row(0)
+
+class CategoryMatcher:
+    """
+    Precompiled form of the `categories` table.
+
+    An ingredient belongs to the first category (in table order) with a
+    keyword that it contains or that contains it. Keywords inside the
+    ingredient are found with an Aho-Corasick automaton in one pass over the
+    ingredient, independent of the number of keywords. An ingredient inside
+    a keyword is found with a single `str.find` over all keywords joined in
+    category order, so the first hit is also the earliest category; that scan
+    is linear in the total keyword text, but runs in C and only on a miss of
+    the per-ingredient memo in `match`.
+    """
+    SEPARATOR = '\x00'
+
+    def __init__(self, table: Dict[str, List[str]]):
+        self.categories: List[str] = list(table)
+
+        # Aho-Corasick automaton; `_rank` holds the lowest category index
+        # of any keyword ending at each state (after following fail links).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._rank: List[Optional[int]] = [None]
+        keywords = []
+        starts = []
+        ranks = []
+        offset = 0
+        for rank, items in enumerate(table.values()):
+            for item in items:
+                state = 0
+                for char in item:
+                    next_state = self._goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][char] = next_state
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._rank.append(None)
+                    state = next_state
+                if self._rank[state] is None:
+                    self._rank[state] = rank
+                keywords.append(item)
+                starts.append(offset)
+                ranks.append(rank)
+                offset += len(item) + len(self.SEPARATOR)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                inherited = self._rank[self._fail[next_state]]
+                if inherited is not None and (
+                        self._rank[next_state] is None or inherited < self._rank[next_state]):
+                    self._rank[next_state] = inherited
+                queue.append(next_state)
+
+        self._keywords = self.SEPARATOR.join(keywords)
+        self._starts = starts
+        self._ranks = ranks
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def _match(self, ingredient: str) -> str:
+        best = self._rank[0]
+        state = 0
+        for char in ingredient:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            rank = self._rank[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == 0:
+                    break
+
+        if best != 0 and self._starts and self.SEPARATOR not in ingredient:
+            position = self._keywords.find(ingredient)
+            if position != -1:
+                rank = self._ranks[bisect_right(self._starts, position) - 1]
+                if best is None or rank < best:
+                    best = rank
+
+        return self.categories[best] if best is not None else 'other'
+
+# Built once at import; rebuild it if `categories` is changed at runtime
+category_matcher = CategoryMatcher(categories)
 
 def categorizeIngredient(ingredient: str) -> str:
     """Categorize an ingredient into one of the predefined categories."""
-    ingredient = ingredient.lower()
-    
-    for category, items in categories.items():
-        if any(
-            item in ingredient or ingredient in item
-            for item in items
-        ):
-            return category
-    
-    return 'other'
+    return category_matcher.match(ingredient.lower())
+
+class SimilarIngredientIndex:
+    """
+    Inverted index over ingredient names for combineIngredients.
+
+    Two names are similar when either contains the other or they share a
+    whole word. Rather than comparing a new name with every indexed one, the
+    index looks up only names that could pass that test: names sharing a word,
+    names with a word containing the new name's first word, and names whose
+    first word occurs inside one of the new name's words. Candidates are then
+    checked with the exact test, so results match a full linear scan.
+    """
+
+    def __init__(self) -> None:
+        self._names: Dict[Any, str] = {}
+        self._words: Dict[Any, frozenset] = {}
+        self._order: Dict[Any, int] = {}
+        self._by_word: Dict[str, set] = {}
+        self._by_fragment: Dict[str, set] = {}
+        self._by_first_word: Dict[str, set] = {}
+        self._wordless: set = set()
+
+    @staticmethod
+    def _fragments(word: str) -> set:
+        return {
+            word[start:end]
+            for start in range(len(word))
+            for end in range(start + 1, len(word) + 1)
+        }
+
+    def add(self, key: Any, name: str) -> None:
+        """Index `name` (already lower-cased) under `key`.
+
+        Re-adding an existing key replaces its name but keeps its original
+        position in the search order, like assigning to an existing dict key.
+        """
+        words = name.split()
+        self._names[key] = name
+        self._words[key] = frozenset(words)
+        self._order.setdefault(key, len(self._order))
+        if not words:
+            self._wordless.add(key)
+            return
+        for word in words:
+            self._by_word.setdefault(word, set()).add(key)
+            for fragment in self._fragments(word):
+                self._by_fragment.setdefault(fragment, set()).add(key)
+        self._by_first_word.setdefault(words[0], set()).add(key)
+
+    def _candidates(self, words: List[str]) -> set:
+        if not words:
+            return set(self._names)
+        candidates = set(self._wordless)
+        for word in words:
+            candidates.update(self._by_word.get(word, ()))
+            for fragment in self._fragments(word):
+                candidates.update(self._by_first_word.get(fragment, ()))
+        candidates.update(self._by_fragment.get(words[0], ()))
+        return candidates
+
+    def find(self, name: str, accept: Callable[[Any], bool] = lambda key: True) -> Optional[Any]:
+        """Return the earliest-added key similar to `name` for which `accept` holds."""
+        words = name.split()
+        for key in sorted(self._candidates(words), key=self._order.__getitem__):
+            existing = self._names[key]
+            if ((name in existing or existing in name or
+                    not self._words[key].isdisjoint(words)) and accept(key)):
+                return key
+        return None
 
 def combineIngredients(ingredients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Combine similar ingredients and their quantities."""
     combined = {}
+    index = SimilarIngredientIndex()
 
     for item in ingredients:
         # Skip empty ingredients
@@ -223,42 +458,39 @@ def combineIngredients(ingredients: List[Dict[str, Any]]) -> List[Dict[str, Any]
 
         # Create a normalized key for similar ingredients
         base_ingredient = item['ingredient'].lower()
-        
-        # Try to find a match among existing keys
-        matched = False
-        for existing_key in list(combined.keys()):
-            existing_base = combined[existing_key]['ingredient'].lower()
-            
-            # Check if ingredients are similar
-            if (base_ingredient in existing_base or 
-                existing_base in base_ingredient or
-                any(word in existing_base.split() for word in base_ingredient.split())):
-                
-                # If units are compatible, combine them
-                if item['unit'] == combined[existing_key]['unit']:
-                    if item['quantity']:
-                        combined[existing_key]['quantities'].append(item['quantity'])
-                    matched = True
-                    break
-        
-        if not matched:
-            key = f"{item['ingredient']}|{item['unit'] or ''}"
-            combined[key] = {
-                'quantities': [item['quantity']] if item['quantity'] else [],
-                'unit': item['unit'],
-                'ingredient': item['ingredient'],
-                'category': categorizeIngredient(item['ingredient'])
-            }
+
+        # Find the first similar ingredient whose unit converts to this one
+        family = unit_family(item['unit'])
+        existing_key = index.find(
+            base_ingredient,
+            lambda key: unit_family(combined[key]['unit']) == family
+        )
+        if existing_key is not None:
+            if item['quantity']:
+                combined[existing_key]['quantities'].append(item['quantity'])
+                combined[existing_key]['units'].append(item['unit'])
+            continue
+
+        key = f"{item['ingredient']}|{item['unit'] or ''}"
+        combined[key] = {
+            'quantities': [item['quantity']] if item['quantity'] else [],
+            'units': [item['unit']] if item['quantity'] else [],
+            'unit': item['unit'],
+            'ingredient': item['ingredient'],
+            'category': item.get('category') or categorizeIngredient(item['ingredient'])
+        }
+        index.add(key, base_ingredient)
 
     # Process combined ingredients
     result = []
     for item in combined.values():
         if item['quantities'] and item['unit']:
-            # Try to normalize and combine quantities
-            total_qty, normalized_unit = combine_quantities(
-                [float(qty) for qty in item['quantities'] if qty],
-                item['unit']
-            )
+            # Normalize to the family's base unit, then pick a display unit
+            ((base_unit, total),) = sum_quantities(
+                [float(qty) for qty in item['quantities']],
+                item['units']
+            ).items()
+            total_qty, normalized_unit = display_quantity(total, base_unit)
             result.append({
                 **item,
                 'displayQuantity': str(total_qty) if total_qty > 0 else None,
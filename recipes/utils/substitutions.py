@@ -0,0 +1,102 @@
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple, Union
+import hashlib
+import re
+
+# Rules of the form r"\bword word\b" are plain literals; runs of them that
+# cannot interact share a single trie-shaped alternation.
+_LITERAL_RULE = re.compile(r'\\b([\w ]+)\\b')
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation for `words` with common prefixes factored out."""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        optional = '' in node
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if optional else group
+
+    return build(trie)
+
+
+def _fold(text: str) -> str:
+    """Map text that re.IGNORECASE treats as equal to one string.
+
+    str.lower() alone is not enough: re also matches 'ſ' with 's' and 'ẞ'
+    with 'ß', which lower() keeps apart.
+    """
+    return text.lower().upper().lower()
+
+
+def _words(text: str) -> Set[str]:
+    return {_fold(word) for word in re.findall(r'\w+', text)}
+
+
+class SubstitutionEngine:
+    """Applies a list of (pattern, replacement) rules to text, in list order.
+
+    The result is the same as calling re.sub(pattern, replacement, text,
+    flags=re.IGNORECASE) for each rule in turn: earlier rules win where rules
+    overlap, and later rules see earlier replacements. Consecutive literal
+    rules that cannot interact are folded into one trie-shaped alternation and
+    applied in a single pass. They cannot interact when no two patterns share
+    a word and no pattern shares a word with an earlier replacement. For
+    typical rule sets the cost then depends on the length of the text rather
+    than on the number of rules.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str]]):
+        self.rules: List[Tuple[str, str]] = list(rules)
+        self.version: str = hashlib.sha256(
+            repr(self.rules).encode('utf-8')
+        ).hexdigest()[:16]
+
+        self._stages: List[Tuple[re.Pattern, Union[str, Callable[[re.Match], str]]]] = []
+        group: Dict[str, str] = {}
+        pattern_words: Set[str] = set()
+        replacement_words: Set[str] = set()
+        for pattern, replacement in self.rules:
+            literal = _LITERAL_RULE.fullmatch(pattern)
+            if not literal or '\\' in replacement:
+                self._add_literal_stage(group)
+                group = {}
+                self._stages.append((re.compile(pattern, re.IGNORECASE), replacement))
+                continue
+            words = _words(literal.group(1))
+            if words & (pattern_words | replacement_words):
+                self._add_literal_stage(group)
+                group, pattern_words, replacement_words = {}, set(), set()
+            group[literal.group(1)] = replacement
+            pattern_words |= words
+            replacement_words |= _words(replacement)
+        self._add_literal_stage(group)
+
+    def _add_literal_stage(self, literals: Dict[str, str]) -> None:
+        if not literals:
+            return
+        regex = re.compile(r'\b' + _trie_pattern(literals) + r'\b', re.IGNORECASE)
+        # Literals in a stage share no word, so no two of them fold alike
+        replacements = {_fold(literal): replacement for literal, replacement in literals.items()}
+        self._stages.append((regex, lambda match: replacements[_fold(match.group())]))
+
+    def convert(self, text: str) -> str:
+        """Return `text` with every rule applied."""
+        for regex, replacement in self._stages:
+            if not text:
+                break
+            text = regex.sub(replacement, text)
+        return text
@@ -1,16 +1,38 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
-from rest_framework.exceptions import PermissionDenied
-from .models import Recipe, SavedRecipe, GroceryList, GroceryItem
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
+from django.db.models import Count, F, Max, Prefetch
+from .models import Recipe, SavedRecipe, GroceryList, GroceryItem, GroceryListJob
+from .conditional import ConditionalGetMixin, latest
+from .exports import csv_lines, ndjson_lines, nest_rows
+from .pagination import RecipeCursorPagination
+from .response_cache import CachedResponseMixin, response_cache
+from .search import search_recipe_ids
 from .serializers import (
-    RecipeSerializer, SavedRecipeSerializer,
+    RecipeSerializer, RecipeListSerializer, SavedRecipeSerializer,
     GroceryListSerializer, GroceryListCreateSerializer,
-    GroceryItemSerializer
+    GroceryListJobSerializer, GroceryItemSerializer
 )
-from users.models import Profile
-from typing import Any
+from .parsers import NDJSONParser
+from .utils.conversion_cache import ConversionCache
+from .utils.ingredient_parser import parseIngredient, categorizeIngredient
+from .utils.substitutions import SubstitutionEngine
+from healthy_recipe_converter.profiling import span
+from users.authentication import StatelessJWTAuthentication
+from users.permissions import IsPaidSubscriberOrReadOnly
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 # Basic substitution logic for MVP
 SUBSTITUTIONS = [
@@ -22,30 +44,171 @@ SUBSTITUTIONS = [
     (r"\bvegetable oil\b", "avocado oil"),
 ]
 
-class RecipeListCreateView(generics.ListCreateAPIView):
+# Compiled once at import; runs of independent rules share one regex pass.
+substitution_engine = SubstitutionEngine(SUBSTITUTIONS)
+
+conversion_cache = ConversionCache(
+    version=substitution_engine.version,
+    maxsize=settings.CONVERSION_CACHE['LRU_SIZE'],
+    cache_alias=settings.CONVERSION_CACHE['CACHE_ALIAS'],
+    timeout=settings.CONVERSION_CACHE['TIMEOUT'],
+)
+
+def convert_recipe(ingredients: str, instructions: str) -> Dict[str, str]:
+    """Apply SUBSTITUTIONS to a recipe's ingredients and instructions."""
+    with span('convert'):
+        return {
+            "converted_ingredients": substitution_engine.convert(ingredients),
+            "converted_instructions": substitution_engine.convert(instructions)
+        }
+
+def cached_convert_recipe(ingredients: str, instructions: str) -> Tuple[Dict[str, str], str]:
+    """Like convert_recipe, but served from the conversion cache when possible.
+
+    Returns the conversion and either "hit" or "miss".
+    """
+    key = conversion_cache.make_key(ingredients, instructions)
+    result = conversion_cache.get(key)
+    if result is not None:
+        return result, "hit"
+    result = convert_recipe(ingredients, instructions)
+    conversion_cache.set(key, result)
+    return result, "miss"
+
+def conversion_input(data: Any) -> Tuple[str, str]:
+    """The ingredients and instructions of a convert request body.
+
+    Raises ValidationError unless `data` is an object whose fields, when
+    present, are strings.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError({"error": "Expected an object with ingredients and instructions"})
+    ingredients = data.get("ingredients", "")
+    instructions = data.get("instructions", "")
+    if not isinstance(ingredients, str) or not isinstance(instructions, str):
+        raise ValidationError({"error": "ingredients and instructions must be strings"})
+    return ingredients, instructions
+
+# Columns rendered by UserSerializer, loaded through select_related
+USER_FIELDS = ('user__id', 'user__username', 'user__email')
+
+def recipe_list_queryset(fields: Iterable[str]):
+    """Recipes with only the columns a list page renders, and its cursor's."""
+    return Recipe.objects.only('id', 'created_at', *fields)
+
+def grocery_item_queryset():
+    """Grocery items with only the serialized columns, all covered by groceryitem_list_order_idx."""
+    return GroceryItem.objects.only(*GroceryItemSerializer.Meta.fields)
+
+def saved_recipe_queryset(user):
+    """A user's saved recipes with the owner and recipe joined in."""
+    return SavedRecipe.objects.filter(user_id=user.pk).select_related(
+        'user', 'recipe'
+    ).only('id', 'created_at', 'updated_at', 'recipe', *USER_FIELDS)
+
+def grocery_list_queryset(user):
+    """A user's grocery lists with owner, recipes and items fetched up front."""
+    return GroceryList.objects.filter(user_id=user.pk).select_related('user').only(
+        'id', 'name', 'status', 'created_at', 'updated_at', *USER_FIELDS
+    ).prefetch_related(
+        Prefetch('recipes', queryset=Recipe.objects.all()),
+        Prefetch('items', queryset=grocery_item_queryset())
+    )
+
+def recipe_page_validators(request) -> Tuple[Any, None]:
+    """
+    ConditionalGetMixin validators for one page of the recipe list: the ids
+    and update times of the page's rows, and whether it has neighbours. That
+    is a single range query for page_size + 1 rows, however many recipes
+    there are.
+    """
+    paginator = RecipeCursorPagination()
+    rows = paginator.paginate_queryset(
+        Recipe.objects.only('id', 'created_at', 'updated_at'), request
+    )
+    version = [(row.pk, row.updated_at) for row in rows]
+    return (version, paginator.has_next, paginator.has_previous), None
+
+def saved_recipe_validators(user) -> Tuple[Any, None]:
+    """ConditionalGetMixin validators for a user's saved recipes."""
+    stats = SavedRecipe.objects.filter(user_id=user.pk).aggregate(
+        updated=Max('updated_at'),
+        recipes_updated=Max('recipe__updated_at'),
+        count=Count('id')
+    )
+    return tuple(stats.values()), None
+
+def grocery_lists_validators(user) -> Tuple[Any, None]:
+    """ConditionalGetMixin validators for all of a user's grocery lists."""
+    stats = GroceryList.objects.filter(user_id=user.pk).aggregate(
+        updated=Max('updated_at'),
+        items_updated=Max('items__updated_at'),
+        recipes_updated=Max('recipes__updated_at'),
+        count=Count('id', distinct=True),
+        item_count=Count('items', distinct=True),
+        recipe_count=Count('recipes', distinct=True)
+    )
+    return tuple(stats.values()), None
+
+def grocery_list_validators(user, pk: int) -> Optional[Tuple[Any, Optional[datetime]]]:
+    """ConditionalGetMixin validators for one grocery list, or None if it isn't the user's."""
+    # Item edits and deletions also bump the list's updated_at, so the
+    # latest timestamp is a sound Last-Modified
+    stats = GroceryList.objects.filter(pk=pk, user_id=user.pk).aggregate(
+        updated=Max('updated_at'),
+        items_updated=Max('items__updated_at'),
+        recipes_updated=Max('recipes__updated_at'),
+        item_count=Count('items', distinct=True),
+        recipe_count=Count('recipes', distinct=True)
+    )
+    if stats['updated'] is None:
+        return None
+    return tuple(stats.values()), latest(
+        stats['updated'], stats['items_updated'], stats['recipes_updated']
+    )
+
+class RecipeListCreateView(CachedResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = RecipeCursorPagination
+
+    def get_validators(self):
+        return recipe_page_validators(self.request)
+
+    def get_response_cache_key(self):
+        return response_cache.page_key(self.request.get_full_path())
+
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return recipe_list_queryset(RecipeListSerializer.requested_fields(self.request))
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return RecipeListSerializer
+        return RecipeSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(
+            user=self.request.user,
+            conversion_version=substitution_engine.version
+        )
 
-class SavedRecipeListView(generics.ListCreateAPIView):
+class SavedRecipeListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    authentication_classes = [StatelessJWTAuthentication]
     serializer_class = SavedRecipeSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsPaidSubscriberOrReadOnly]
+    subscription_required_message = "Saving recipes requires a paid subscription."
+    vary_on_authorization = True
+
+    def get_validators(self):
+        return saved_recipe_validators(self.request.user)
 
     def get_queryset(self):
-        return SavedRecipe.objects.filter(user=self.request.user)
+        return saved_recipe_queryset(self.request.user)
 
     def perform_create(self, serializer):
-        # Check if user has a paid subscription
-        try:
-            profile = Profile.objects.get(user=self.request.user)
-            if not profile.paid_subscription:
-                raise PermissionDenied("Saving recipes requires a paid subscription.")
-        except Profile.DoesNotExist:
-            raise PermissionDenied("User profile not found.")
-
         # Get the recipe to save
         recipe_id = self.request.data.get('recipe')
         try:
@@ -57,13 +220,109 @@ class SavedRecipeListView(generics.ListCreateAPIView):
             )
 
         # Check if recipe is already saved
-        if SavedRecipe.objects.filter(user=self.request.user, recipe=recipe).exists():
+        if SavedRecipe.objects.filter(user_id=self.request.user.pk, recipe=recipe).exists():
             return Response(
                 {"error": "Recipe already saved"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer.save(user=self.request.user, recipe=recipe)
+        serializer.save(user_id=self.request.user.pk, recipe=recipe)
+
+class ExportView(ABC, APIView):
+    """
+    Streams rows as NDJSON (default) or CSV, chosen with `?output=`.
+
+    Subclasses provide `get_rows()`, a values() queryset read with
+    `.iterator(chunk_size=...)`. On PostgreSQL that uses a server-side
+    cursor, so memory stays flat and the first line goes out before the
+    query has finished. `get_records()` may reshape rows for NDJSON.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    filename = 'export'
+    csv_fields: Tuple[str, ...] = ()
+    outputs = {'ndjson': NDJSONParser.media_type, 'csv': 'text/csv'}
+
+    @abstractmethod
+    def get_rows(self) -> Iterator[Dict[str, Any]]:
+        ...
+
+    def get_records(self) -> Iterator[Dict[str, Any]]:
+        return self.get_rows()
+
+    def get(self, request: Any) -> Any:
+        output = request.query_params.get('output', 'ndjson')
+        if output not in self.outputs:
+            return Response(
+                {"error": f"output must be one of: {', '.join(self.outputs)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if output == 'csv':
+            lines = csv_lines(self.csv_fields, self.get_rows())
+        else:
+            lines = ndjson_lines(self.get_records())
+        response = StreamingHttpResponse(lines, content_type=self.outputs[output])
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}.{output}"'
+        return response
+
+class SavedRecipeExportView(ExportView):
+    """All of the user's saved recipes, one row per recipe."""
+    filename = 'saved-recipes'
+    csv_fields = (
+        'id', 'saved_at', 'recipe', 'title', 'ingredients', 'instructions',
+        'converted_ingredients', 'converted_instructions',
+        'recipe_created_at', 'recipe_updated_at'
+    )
+
+    def get_rows(self):
+        return SavedRecipe.objects.filter(user_id=self.request.user.pk).order_by('pk').values(
+            'id',
+            'recipe',
+            saved_at=F('created_at'),
+            title=F('recipe__title'),
+            ingredients=F('recipe__ingredients'),
+            instructions=F('recipe__instructions'),
+            converted_ingredients=F('recipe__converted_ingredients'),
+            converted_instructions=F('recipe__converted_instructions'),
+            recipe_created_at=F('recipe__created_at'),
+            recipe_updated_at=F('recipe__updated_at')
+        ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+class GroceryListExportView(ExportView):
+    """
+    All of the user's grocery lists with their items. CSV has one row per
+    item (lists without items get one row with empty item columns); NDJSON
+    has one line per list with its items nested.
+    """
+    filename = 'grocery-lists'
+    list_fields = ('list_id', 'list_name', 'list_status', 'list_created_at', 'list_updated_at')
+    item_fields = (
+        'item_id', 'item_ingredient', 'item_quantity', 'item_unit',
+        'item_category', 'item_checked', 'item_custom'
+    )
+    csv_fields = list_fields + item_fields
+
+    def get_rows(self):
+        # One outer join ordered by list, so NDJSON can nest as it streams
+        return GroceryList.objects.filter(user_id=self.request.user.pk).order_by(
+            'pk', 'items__category', 'items__ingredient', 'items__pk'
+        ).values(
+            list_id=F('id'),
+            list_name=F('name'),
+            list_status=F('status'),
+            list_created_at=F('created_at'),
+            list_updated_at=F('updated_at'),
+            item_id=F('items__id'),
+            item_ingredient=F('items__ingredient'),
+            item_quantity=F('items__quantity'),
+            item_unit=F('items__unit'),
+            item_category=F('items__category'),
+            item_checked=F('items__checked'),
+            item_custom=F('items__custom')
+        ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+    def get_records(self):
+        return nest_rows(self.get_rows(), self.list_fields, 'item_', 'items')
 
 class SavedRecipeDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -72,94 +331,257 @@ class SavedRecipeDeleteView(generics.DestroyAPIView):
     def get_queryset(self):
         return SavedRecipe.objects.filter(user=self.request.user)
 
-class RecipeDetailView(generics.RetrieveAPIView):
+class RecipeDetailView(CachedResponseMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = [AllowAny]
 
+    def get_validators(self):
+        updated = Recipe.objects.filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', flat=True
+        ).first()
+        if updated is None:
+            return None
+        return updated, updated
+
+    def get_response_cache_key(self):
+        return response_cache.detail_key(self.kwargs['pk'])
+
+class RecipeSearchView(CachedResponseMixin, generics.ListAPIView):
+    """
+    Ranked full-text search over recipe titles and ingredients.
+
+    `q` holds the search words; a recipe must match all of them. Results use
+    the compact list representation and accept `fields` like the recipe list.
+    """
+    serializer_class = RecipeListSerializer
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 100
+
+    def get_response_cache_key(self):
+        return response_cache.page_key(self.request.get_full_path())
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '')
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        ids = search_recipe_ids(query, limit)
+        fields = RecipeListSerializer.requested_fields(self.request)
+        recipes = Recipe.objects.only('id', *fields).in_bulk(ids)
+        return [recipes[pk] for pk in ids if pk in recipes]
+
 class RecipeConvertView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request: Any) -> Response:
-        ingredients = request.data.get("ingredients", "")
-        instructions = request.data.get("instructions", "")
-        converted_ingredients = ingredients
-        converted_instructions = instructions
-        import re
-        for pattern, replacement in SUBSTITUTIONS:
-            converted_ingredients = re.sub(pattern, replacement, converted_ingredients, flags=re.IGNORECASE)
-            converted_instructions = re.sub(pattern, replacement, converted_instructions, flags=re.IGNORECASE)
+        ingredients, instructions = conversion_input(request.data)
+        result, cache_status = cached_convert_recipe(ingredients, instructions)
+        return Response(
+            result,
+            status=status.HTTP_200_OK,
+            headers={"X-Conversion-Cache": cache_status}
+        )
+
+class RecipeBatchConvertView(APIView):
+    """
+    Convert many recipes in one request.
+
+    Accepts a JSON array of {"ingredients", "instructions"} objects (or an
+    object with a "recipes" array), or an `application/x-ndjson` body with one
+    recipe per line. Results are streamed back as NDJSON in input order, one
+    line per recipe, as soon as each is converted. Each line carries a
+    "cache" field with the conversion cache status.
+    """
+    permission_classes = [AllowAny]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request: Any) -> Any:
+        recipes = request.data
+        if isinstance(recipes, dict):
+            recipes = recipes.get("recipes")
+        # A list from JSONParser, or NDJSONParser's lazy generator
+        if not isinstance(recipes, (list, Iterator)):
+            return Response(
+                {"error": "Expected an array of recipes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return StreamingHttpResponse(
+            self.stream_results(recipes),
+            content_type=NDJSONParser.media_type
+        )
+
+    def stream_results(self, recipes: Iterable[Any]) -> Iterator[str]:
+        for index, recipe in enumerate(recipes):
+            if isinstance(recipe, Exception):
+                yield json.dumps({"index": index, "error": str(recipe)}) + "\n"
+                continue
+            try:
+                ingredients, instructions = conversion_input(recipe)
+            except ValidationError as exc:
+                # A bad item gets an error line; the rest of the stream goes on
+                result = {"error": str(exc.detail["error"])}
+            else:
+                converted, cache_status = cached_convert_recipe(ingredients, instructions)
+                result = {**converted, "cache": cache_status}
+                if "id" in recipe:
+                    result["id"] = recipe["id"]
+            yield json.dumps({"index": index, **result}) + "\n"
+
+class CacheStatsView(APIView):
+    """Hit and miss counts of this process's caches."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Any) -> Response:
         return Response({
-            "converted_ingredients": converted_ingredients,
-            "converted_instructions": converted_instructions
-        }, status=status.HTTP_200_OK)
+            "response_cache": response_cache.stats(),
+            "conversion_cache": conversion_cache.stats(),
+        })
 
-class GroceryListView(generics.ListCreateAPIView):
+class GroceryListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    authentication_classes = [StatelessJWTAuthentication]
     serializer_class = GroceryListSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsPaidSubscriberOrReadOnly]
+    subscription_required_message = "Creating grocery lists requires a paid subscription."
+    vary_on_authorization = True
+
+    def get_validators(self):
+        return grocery_lists_validators(self.request.user)
 
     def get_queryset(self):
-        return GroceryList.objects.filter(user=self.request.user)
+        return grocery_list_queryset(self.request.user)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return GroceryListCreateSerializer
         return GroceryListSerializer
 
+    def run_in_background(self) -> bool:
+        """Whether to hand item generation to the job queue (`?background=1|0`)."""
+        background = self.request.query_params.get('background')
+        if background is None:
+            return settings.GROCERY_LIST_BACKGROUND
+        return background.lower() in ('1', 'true', 'yes')
+
+    def create(self, request, *args, **kwargs):
+        if not self.run_in_background():
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            grocery_list = serializer.save(user_id=request.user.pk, status='building')
+            job = GroceryListJob.enqueue(grocery_list)
+        status_url = request.build_absolute_uri(
+            reverse('grocery-list-job', kwargs={'pk': job.pk})
+        )
+        return Response(
+            {
+                "id": grocery_list.pk,
+                "name": grocery_list.name,
+                "status": grocery_list.status,
+                "job": job.pk,
+                "status_url": status_url,
+            },
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url}
+        )
+
     def perform_create(self, serializer):
-        # Check if user has a paid subscription
-        try:
-            profile = Profile.objects.get(user=self.request.user)
-            if not profile.paid_subscription:
-                raise PermissionDenied("Creating grocery lists requires a paid subscription.")
-        except Profile.DoesNotExist:
-            raise PermissionDenied("User profile not found.")
-
-        grocery_list = serializer.save(user=self.request.user)
-
-        # Parse ingredients from recipes and create grocery items
-        from .utils.ingredient_parser import parseIngredient, categorizeIngredient, combineIngredients
-
-        all_ingredients = []
-        for recipe in grocery_list.recipes.all():
-            ingredients = recipe.converted_ingredients.split('\n')
-            for ingredient in ingredients:
-                if ingredient.strip():
-                    parsed = parseIngredient(ingredient)
-                    if parsed['ingredient']:
-                        all_ingredients.append(parsed)
-
-        # Combine similar ingredients
-        combined = combineIngredients(all_ingredients)
-
-        # Create grocery items
-        items_to_create = [
-            GroceryItem(
-                grocery_list=grocery_list,
-                ingredient=item['ingredient'],
-                quantity=item['displayQuantity'],
-                unit=item['unit'],
-                category=item['category']
-            ) for item in combined
-        ]
-        GroceryItem.objects.bulk_create(items_to_create)
-
-class GroceryListDetailView(generics.RetrieveDestroyAPIView):
+        grocery_list = serializer.save(user_id=self.request.user.pk)
+        grocery_list.generate_items()
+
+class GroceryListDetailView(ConditionalGetMixin, generics.RetrieveDestroyAPIView):
+    authentication_classes = [StatelessJWTAuthentication]
     serializer_class = GroceryListSerializer
     permission_classes = [IsAuthenticated]
+    vary_on_authorization = True
+
+    def get_validators(self):
+        return grocery_list_validators(self.request.user, self.kwargs['pk'])
 
     def get_queryset(self):
-        return GroceryList.objects.filter(user=self.request.user)
+        if self.request.method == 'GET':
+            return grocery_list_queryset(self.request.user)
+        return GroceryList.objects.filter(user_id=self.request.user.pk)
+
+class GroceryListRecipeAddView(APIView):
+    """Add a recipe to a grocery list, merging its ingredients into the items."""
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request: Any, pk: int) -> Response:
+        grocery_list = get_object_or_404(GroceryList, pk=pk, user_id=request.user.pk)
+        if grocery_list.status == 'building':
+            return Response(
+                {"error": "Grocery list is still being built"},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": "Expected a JSON object."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            recipe = Recipe.objects.get(pk=request.data.get('recipe'))
+        except (Recipe.DoesNotExist, ValueError, TypeError):
+            return Response(
+                {"error": "Recipe not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        added = grocery_list.add_recipe(recipe)
+        serializer = GroceryListSerializer(grocery_list_queryset(request.user).get(pk=pk))
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if added else status.HTTP_200_OK
+        )
+
+class GroceryListRecipeRemoveView(APIView):
+    """Remove a recipe from a grocery list, subtracting its ingredients."""
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request: Any, pk: int, recipe_id: int) -> Response:
+        grocery_list = get_object_or_404(GroceryList, pk=pk, user_id=request.user.pk)
+        if grocery_list.status == 'building':
+            return Response(
+                {"error": "Grocery list is still being built"},
+                status=status.HTTP_409_CONFLICT
+            )
+        recipe = get_object_or_404(Recipe, pk=recipe_id)
+        if not grocery_list.remove_recipe(recipe):
+            return Response(
+                {"error": "Recipe is not on this grocery list"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        serializer = GroceryListSerializer(grocery_list_queryset(request.user).get(pk=pk))
+        return Response(serializer.data)
+
+class GroceryListJobDetailView(generics.RetrieveAPIView):
+    """Status of a background grocery list generation job."""
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = GroceryListJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return GroceryListJob.objects.filter(grocery_list__user_id=self.request.user.pk)
 
 class GroceryItemCreateView(generics.CreateAPIView):
     serializer_class = GroceryItemSerializer
     permission_classes = [IsAuthenticated]
 
-    def perform_create(self, serializer):
-        grocery_list = GroceryList.objects.get(
-            pk=self.kwargs['list_id'],
-            user=self.request.user
+    def get_grocery_list(self) -> GroceryList:
+        return get_object_or_404(
+            GroceryList, pk=self.kwargs['list_id'], user_id=self.request.user.pk
         )
+
+    def perform_create(self, serializer):
+        grocery_list = self.get_grocery_list()
         parsed = parseIngredient(serializer.validated_data['ingredient'])
         serializer.save(
             grocery_list=grocery_list,
@@ -169,6 +591,119 @@ class GroceryItemCreateView(generics.CreateAPIView):
             category=categorizeIngredient(parsed['ingredient']),
             custom=True
         )
+        grocery_list.touch()
+
+class GroceryListItemsView(GroceryItemCreateView):
+    """
+    Add one item (POST), or change or delete many items of a list at once.
+
+    PATCH takes `{"ids": [...], "changes": {...}}` to apply the same changes
+    to every item, or `{"items": [{"id": ..., <field>: ...}, ...]}` for
+    per-item changes. DELETE takes `{"ids": [...]}`. Every id must belong to
+    the list or nothing is applied. Responses list only the rows that changed.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    bulk_fields = ('checked', 'quantity', 'unit', 'category')
+    max_bulk_items = 500
+
+    def clean_body(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            raise ValidationError({"error": "Expected a JSON object."})
+        return data
+
+    def clean_ids(self, ids: Any) -> list:
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({"ids": "Expected a non-empty list of item ids."})
+        if len(ids) > self.max_bulk_items:
+            raise ValidationError({"ids": f"At most {self.max_bulk_items} items per request."})
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            raise ValidationError({"ids": "Item ids must be integers."})
+        if len(set(ids)) != len(ids):
+            raise ValidationError({"ids": "Item ids must be unique."})
+        return ids
+
+    def clean_changes(self, changes: Any) -> Dict[str, Any]:
+        if not isinstance(changes, dict):
+            raise ValidationError({"changes": "Expected an object of field changes."})
+        if not changes:
+            raise ValidationError({"changes": "Expected at least one field to change."})
+        unknown = set(changes) - set(self.bulk_fields)
+        if unknown:
+            raise ValidationError({"changes": f"Cannot bulk update: {', '.join(sorted(unknown))}."})
+        serializer = self.get_serializer(data=changes, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return {name: serializer.validated_data[name] for name in changes}
+
+    def locked_items(self, grocery_list: GroceryList, ids: list):
+        """The list's items with `ids`, locked; 404 if any id isn't on the list."""
+        items = GroceryItem.objects.select_for_update().filter(
+            grocery_list=grocery_list, pk__in=ids
+        )
+        found = set(items.values_list('pk', flat=True))
+        missing = sorted(set(ids) - found)
+        if missing:
+            raise NotFound({"error": "Items not found on this grocery list", "ids": missing})
+        return items
+
+    def patch(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        data = self.clean_body(request.data)
+        if 'items' in data:
+            entries = data['items']
+            if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+                raise ValidationError({"items": "Expected a list of objects with an id."})
+            ids = self.clean_ids([entry.get('id') for entry in entries])
+            changes = {
+                entry['id']: self.clean_changes({k: v for k, v in entry.items() if k != 'id'})
+                for entry in entries
+            }
+            uniform = None
+        else:
+            ids = self.clean_ids(data.get('ids'))
+            uniform = self.clean_changes(data.get('changes'))
+            changes = dict.fromkeys(ids, uniform)
+
+        grocery_list = self.get_grocery_list()
+        now = timezone.now()
+        with transaction.atomic():
+            items = self.locked_items(grocery_list, ids)
+            if uniform is not None and not {'quantity', 'unit'} & set(uniform):
+                # Flags only: one UPDATE over the rows whose values differ
+                changed_ids = list(items.exclude(**uniform).values_list('pk', flat=True))
+                GroceryItem.objects.filter(pk__in=changed_ids).update(updated_at=now, **uniform)
+                changed = list(GroceryItem.objects.filter(pk__in=changed_ids))
+            else:
+                changed = []
+                fields = {'updated_at'}
+                for item in items:
+                    updates = {
+                        name: value for name, value in changes[item.pk].items()
+                        if getattr(item, name) != value
+                    }
+                    if not updates:
+                        continue
+                    for name, value in updates.items():
+                        setattr(item, name, value)
+                    fields.update(updates)
+                    if not item.custom and {'quantity', 'unit'} & set(updates):
+                        item.rebase_quantity()
+                        fields.update(('base_quantity', 'base_unit'))
+                    item.updated_at = now
+                    changed.append(item)
+                if changed:
+                    GroceryItem.objects.bulk_update(changed, sorted(fields))
+            if changed:
+                grocery_list.touch()
+
+        serializer = self.get_serializer(changed, many=True)
+        return Response(serializer.data)
+
+    def delete(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        ids = self.clean_ids(self.clean_body(request.data).get('ids'))
+        grocery_list = self.get_grocery_list()
+        with transaction.atomic():
+            self.locked_items(grocery_list, ids).delete()
+            grocery_list.touch()
+        return Response({"deleted": sorted(ids)})
 
 class GroceryItemUpdateView(generics.UpdateAPIView):
     serializer_class = GroceryItemSerializer
@@ -179,6 +714,14 @@ class GroceryItemUpdateView(generics.UpdateAPIView):
             grocery_list__user=self.request.user
         )
 
+    def perform_update(self, serializer):
+        item = serializer.save()
+        # A hand-edited amount becomes the new total recipes add to
+        if not item.custom and {'quantity', 'unit'} & set(serializer.validated_data):
+            item.rebase_quantity()
+            item.save(update_fields=['base_quantity', 'base_unit'])
+        GroceryList(pk=item.grocery_list_id).touch()
+
 class GroceryItemDeleteView(generics.DestroyAPIView):
     serializer_class = GroceryItemSerializer
     permission_classes = [IsAuthenticated]
@@ -187,3 +730,7 @@ class GroceryItemDeleteView(generics.DestroyAPIView):
         return GroceryItem.objects.filter(
             grocery_list__user=self.request.user
         )
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        GroceryList(pk=instance.grocery_list_id).touch()
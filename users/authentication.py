@@ -0,0 +1,76 @@
+from typing import Any
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import cached_property
+from healthy_recipe_converter.profiling import span
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+def denylist_cache_key(jti: str) -> str:
+    return f'jwt-denylist:{jti}'
+
+def revoke_token(token: Token) -> None:
+    """Reject `token` from now until it would have expired anyway."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    remaining = int(token['exp'] - timezone.now().timestamp()) + 1
+    if remaining > 0:
+        cache.set(denylist_cache_key(jti), True, remaining)
+
+def is_token_revoked(token: Token) -> bool:
+    jti = token.get(api_settings.JTI_CLAIM)
+    return bool(jti) and cache.get(denylist_cache_key(jti), False)
+
+
+class DenylistJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that also rejects tokens revoked at logout."""
+
+    def authenticate(self, request):
+        with span('auth'):
+            return super().authenticate(request)
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken('Token has been revoked')
+        return validated_token
+
+
+class ClaimsUser(TokenUser):
+    """
+    A request user built from access-token claims (id, username, entitlement
+    flags) without touching the database. `orm_user` loads the full User row
+    the first time something needs it.
+    """
+
+    @cached_property
+    def id(self) -> Any:
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def orm_user(self):
+        return get_user_model().objects.get(pk=self.pk)
+
+
+class StatelessJWTAuthentication(DenylistJWTAuthentication):
+    """
+    Authenticates with a ClaimsUser instead of loading the User row, saving a
+    query per request, when the JWT_STATELESS_AUTH setting is on. Otherwise it
+    behaves exactly like DenylistJWTAuthentication.
+
+    In stateless mode a deactivated user keeps access until their access
+    token expires or is revoked.
+    """
+
+    def get_user(self, validated_token: Token) -> Any:
+        if not settings.JWT_STATELESS_AUTH:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        return ClaimsUser(validated_token)
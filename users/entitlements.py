@@ -0,0 +1,29 @@
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from .models import Profile
+
+def entitlements_cache_key(user_id: int) -> str:
+    return f'entitlements:{user_id}'
+
+def get_entitlements(user_id: int) -> Optional[Dict[str, bool]]:
+    """
+    Return the feature flags for a user, or None if they have no profile.
+
+    Results are cached for ENTITLEMENTS_CACHE_TIMEOUT seconds and dropped
+    whenever the user's Profile is saved or deleted (see users.signals).
+    Code that changes profiles with queryset.update() must call
+    invalidate_entitlements itself.
+    """
+    key = entitlements_cache_key(user_id)
+    entitlements = cache.get(key)
+    if entitlements is None:
+        profile = Profile.objects.filter(user_id=user_id).only('paid_subscription').first()
+        if profile is None:
+            return None
+        entitlements = {'paid_subscription': profile.paid_subscription}
+        cache.set(key, entitlements, settings.ENTITLEMENTS_CACHE_TIMEOUT)
+    return entitlements
+
+def invalidate_entitlements(user_id: int) -> None:
+    cache.delete(entitlements_cache_key(user_id))
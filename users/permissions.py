@@ -0,0 +1,23 @@
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import BasePermission, SAFE_METHODS
+from .entitlements import get_entitlements
+
+
+class IsPaidSubscriberOrReadOnly(BasePermission):
+    """
+    Allows unsafe methods only for users with a paid subscription.
+
+    Views can set `subscription_required_message` to explain what the
+    subscription is needed for.
+    """
+    message = 'This action requires a paid subscription.'
+
+    def has_permission(self, request, view) -> bool:
+        if request.method in SAFE_METHODS:
+            return True
+        entitlements = get_entitlements(request.user.pk)
+        if entitlements is None:
+            raise PermissionDenied('User profile not found.')
+        if not entitlements['paid_subscription']:
+            raise PermissionDenied(getattr(view, 'subscription_required_message', self.message))
+        return True
@@ -1,3 +1,128 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from recipes.models import GroceryList, Recipe, SavedRecipe
+from .authentication import (
+    ClaimsUser, DenylistJWTAuthentication, StatelessJWTAuthentication, is_token_revoked
+)
+from .entitlements import get_entitlements
+from .models import Profile
+from .tokens import tokens_for_user
+
+
+class AuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.other = User.objects.create_user('baker', 'baker@example.com', 'password')
+        Profile.objects.bulk_create([Profile(user=self.user), Profile(user=self.other)])
+        self.refresh = tokens_for_user(self.user)
+        self.access = str(self.refresh.access_token)
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def bearer_request(self, access):
+        return RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_logout_revokes_tokens(self):
+        client = self.client_for(self.access)
+        self.assertEqual(client.get(reverse('profile')).status_code, 200)
+        response = client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get(reverse('profile')).status_code, 401)
+        self.assertEqual(client.get(reverse('saved-recipe-list')).status_code, 401)
+        self.assertTrue(is_token_revoked(RefreshToken(str(self.refresh))))
+
+    def test_other_tokens_stay_valid_after_logout(self):
+        other_access = str(tokens_for_user(self.other).access_token)
+        self.client_for(self.access).post(reverse('logout'))
+        self.assertEqual(self.client_for(other_access).get(reverse('profile')).status_code, 200)
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_stateless_auth_skips_the_user_query(self):
+        with self.assertNumQueries(0):
+            user, token = StatelessJWTAuthentication().authenticate(self.bearer_request(self.access))
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, 'cook')
+        self.assertEqual(user.orm_user, self.user)
+
+    def test_stateful_auth_loads_the_user(self):
+        with self.assertNumQueries(1):
+            user, token = StatelessJWTAuthentication().authenticate(self.bearer_request(self.access))
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(1):
+            user, token = DenylistJWTAuthentication().authenticate(self.bearer_request(self.access))
+        self.assertEqual(user, self.user)
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_claims_user_scopes_queries(self):
+        recipe = Recipe.objects.create(title='Soup', ingredients='1 onion', instructions='')
+        mine = SavedRecipe.objects.create(user=self.user, recipe=recipe)
+        SavedRecipe.objects.create(user=self.other, recipe=recipe)
+
+        user, token = StatelessJWTAuthentication().authenticate(self.bearer_request(self.access))
+        self.assertEqual(list(SavedRecipe.objects.filter(user_id=user.pk)), [mine])
+        response = self.client_for(self.access).get(reverse('saved-recipe-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([saved['id'] for saved in response.json()], [mine.pk])
+
+class EntitlementPermissionTests(TestCase):
+    """Writes to paid features need a paid Profile; reads never do."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cook', 'cook@example.com', 'password')
+        self.profile = Profile.objects.create(user=self.user)
+        self.recipe = Recipe.objects.create(title='Toast', ingredients='1 slice bread', instructions='')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def save_recipe(self):
+        return self.client.post(reverse('saved-recipe-list'), {'recipe': self.recipe.pk}, format='json')
+
+    def test_free_user_cannot_write(self):
+        response = self.save_recipe()
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['detail'], 'Saving recipes requires a paid subscription.')
+        response = self.client.post(reverse('grocery-list'), {'name': 'Weekly'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['detail'], 'Creating grocery lists requires a paid subscription.')
+        self.assertFalse(SavedRecipe.objects.exists())
+        self.assertFalse(GroceryList.objects.exists())
+
+    def test_free_user_can_read(self):
+        self.assertEqual(self.client.get(reverse('saved-recipe-list')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('grocery-list')).status_code, 200)
+
+    def test_paid_user_can_write(self):
+        self.profile.paid_subscription = True
+        self.profile.save()
+        self.assertEqual(self.save_recipe().status_code, 201)
+        self.assertTrue(SavedRecipe.objects.filter(user=self.user, recipe=self.recipe).exists())
+
+    def test_missing_profile_is_forbidden(self):
+        self.profile.delete()
+        response = self.save_recipe()
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['detail'], 'User profile not found.')
+
+    def test_entitlements_are_cached_until_profile_saved(self):
+        self.assertEqual(get_entitlements(self.user.pk), {'paid_subscription': False})
+        Profile.objects.filter(pk=self.profile.pk).update(paid_subscription=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_entitlements(self.user.pk), {'paid_subscription': False})
+        self.assertEqual(self.save_recipe().status_code, 403)
+
+        self.profile.refresh_from_db()
+        self.profile.save()
+        self.assertEqual(get_entitlements(self.user.pk), {'paid_subscription': True})
+        self.assertEqual(self.save_recipe().status_code, 201)
 
-# Create your tests here.
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+from .entitlements import get_entitlements
+
+
+def tokens_for_user(user) -> RefreshToken:
+    """
+    Issue a refresh token (and, through it, an access token) for `user`.
+
+    The username and entitlement flags are embedded as claims so stateless
+    authentication can build a request user without a database query. The
+    flags are a snapshot from login time; permission checks still go through
+    users.entitlements so subscription changes apply immediately.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['username'] = user.username
+    entitlements = get_entitlements(user.pk) or {}
+    refresh['paid_subscription'] = entitlements.get('paid_subscription', False)
+    return refresh
@@ -3,7 +3,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import revoke_token
+from django.http import Http404
+from .entitlements import get_entitlements
+from .tokens import tokens_for_user
 from .models import Profile
 from .serializers import RegisterSerializer, UserSerializer, ProfileSerializer
 from typing import Any
@@ -19,7 +24,7 @@ class LoginView(APIView):
         password = request.data.get('password')
         user = authenticate(request, username=username, password=password)
         if user is not None:
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token)
@@ -30,10 +35,22 @@ class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def post(self, request: Any) -> Response:
         logout(request)
+        if request.auth is not None:
+            revoke_token(request.auth)
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                revoke_token(RefreshToken(refresh))
+            except TokenError:
+                pass
         return Response({'detail': 'Logged out'})
 
 class ProfileView(generics.RetrieveAPIView):
     serializer_class = ProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        # Built from the cached entitlements rather than queried per request
+        entitlements = get_entitlements(self.request.user.pk)
+        if entitlements is None:
+            raise Http404("User profile not found.")
+        return Profile(user=self.request.user, **entitlements)